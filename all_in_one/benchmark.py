@@ -0,0 +1,194 @@
+# Benchmarks for the lineup generation and render hot paths, with JSON output and a baseline comparison.
+# The Tk benchmarks need a display: a virtual one is started with pyvirtualdisplay (Xvfb) when available,
+# otherwise $DISPLAY is used, and without either only the headless engine benchmarks run.
+#
+#   python benchmark.py --output results.json --baseline benchmark_baseline.json
+#   python benchmark.py --save-baseline benchmark_baseline.json
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from lineup_engine import ROUND_COUNT, LineupEngine, NUMPY_AVAILABLE, load_roster
+
+# --- Optional imports for the virtual display ---
+try:
+    from pyvirtualdisplay import Display
+    VIRTUAL_DISPLAY_AVAILABLE = True
+except ImportError:
+    VIRTUAL_DISPLAY_AVAILABLE = False
+
+OPERATORS_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'operators_list.json')
+# A benchmark counts as a regression when its median is this many times slower than the baseline median.
+REGRESSION_THRESHOLD = 1.25
+
+
+def time_call(func, repeats, warmup=2):
+    """Runs func warmup + repeats times and returns timing statistics in milliseconds."""
+    for _ in range(warmup): func()
+    samples = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - start) * 1000)
+    return {"repeats": repeats, "min_ms": min(samples), "median_ms": statistics.median(samples),
+            "mean_ms": statistics.fmean(samples), "max_ms": max(samples)}
+
+
+def engine_benchmarks(repeats):
+    """Headless benchmarks of the lineup engine; these run everywhere."""
+    attackers, defenders = load_roster(OPERATORS_FILE)
+    engine = LineupEngine(attackers, defenders, seed=0)
+    benchmarks = {}
+    for mode in ROUND_COUNT:
+        benchmarks[f"engine.generate[{mode}]"] = (lambda mode=mode: engine.generate(mode), repeats * 10)
+    benchmarks["engine.generate_batch[Ranked x1000]"] = (lambda: engine.generate_batch("Ranked", 1000), repeats)
+    if NUMPY_AVAILABLE:
+        benchmarks["engine.sample_bulk[Ranked x100000]"] = (lambda: engine.sample_bulk("Ranked", 100_000), max(3, repeats // 4))
+    return benchmarks
+
+
+def gui_benchmarks(app, repeats):
+    """Benchmarks of the Tk hot paths; every call is followed by update_idletasks so layout work is counted."""
+    win = app.win
+
+    def flushed(func):
+        def run():
+            func()
+            win.update_idletasks()
+        return run
+
+    def reopen_disable_window():
+        if app.disable_window and app.disable_window.winfo_exists(): app.disable_window.destroy()
+        app.open_disable_window()
+
+    def reshow_disable_window():
+        app.disable_window.withdraw()
+        app.open_disable_window()
+
+    def invert_twice():
+        for _ in range(2):
+            app.invert_disables_for_current_view()
+            app.flush_op_visuals()
+
+    def switch_tabs():
+        app.switch_disable_view('defenders')
+        app.switch_disable_view('attackers')
+
+    benchmarks = {}
+    for mode in ROUND_COUNT:
+        benchmarks[f"gui.generate_new_set[{mode}]"] = (flushed(lambda mode=mode: app.generate_new_set(mode)), repeats)
+    app.generate_new_set("Ranked")
+    benchmarks["gui.display_round_operators[Ranked]"] = (flushed(app.display_round_operators), repeats)
+    benchmarks["gui.display_backup_operators[Ranked]"] = (flushed(app.display_backup_operators), repeats)
+    # Alternating two lineups makes every cell change, so both renderers do their full swap work.
+    import op_rando_with_scrape as gui
+    lineups = [app.engine.generate("Ranked")[1] for _ in range(2)]
+    canvas_frame = gui.Frame(win)
+    canvas_renderer = gui.LineupCanvas(canvas_frame, "Round", app.attackers + app.defenders)
+    flip = [0]
+
+    def alternate(render):
+        def run():
+            flip[0] ^= 1
+            render(lineups[flip[0]])
+        return run
+
+    benchmarks["gui.render_alternating[widgets]"] = (flushed(alternate(lambda data: app._display_operators(app.output_frame, data, "Round"))), repeats)
+    benchmarks["gui.render_alternating[canvas]"] = (flushed(alternate(lambda data: canvas_renderer.show(data, app.load_main_display_image))), repeats)
+    benchmarks["gui.fix_window_size"] = (flushed(app.fix_window_size), max(3, repeats // 4))
+    benchmarks["gui.copy_to_clipboard"] = (app.copy_to_clipboard, repeats)
+    benchmarks["gui.open_disable_window"] = (flushed(reopen_disable_window), max(3, repeats // 4))
+    benchmarks["gui.open_disable_window[reuse]"] = (flushed(reshow_disable_window), repeats)
+    benchmarks["gui.switch_disable_view[x2]"] = (flushed(switch_tabs), repeats)
+    benchmarks["gui.bulk_invert[x2]"] = (flushed(invert_twice), repeats)
+    return benchmarks
+
+
+def run_benchmarks(benchmarks, results):
+    for name, (func, repeats) in benchmarks.items():
+        results[name] = time_call(func, repeats)
+        print(f"{name:<44}{results[name]['median_ms']:>10.3f} ms", file=sys.stderr)
+
+
+def start_gui():
+    """Starts the app for benchmarking, on a virtual display if possible. Returns (app, display) or (None, None)."""
+    display = None
+    if VIRTUAL_DISPLAY_AVAILABLE:
+        display = Display(visible=False, size=(1920, 1080))
+        display.start()
+    elif not os.environ.get('DISPLAY') and sys.platform.startswith('linux'):
+        return None, None
+    import op_rando_with_scrape as gui # Imports tkinter, PIL and keyboard
+    # Keep benchmark lineups out of the player's real recency history and shuffle bag.
+    state_dir = tempfile.mkdtemp(prefix='r6_benchmark_')
+    gui.HISTORY_FILE = os.path.join(state_dir, 'lineup_history.json')
+    gui.BAG_FILE = os.path.join(state_dir, 'shuffle_bag.json')
+    app = gui.R6OperatorGenerator()
+    app.win.update()
+    return app, display
+
+
+def compare(results, baseline, threshold=REGRESSION_THRESHOLD):
+    """Returns {name: ratio} of benchmarks whose median got slower than threshold x the baseline median."""
+    regressions = {}
+    for name, stats in results["benchmarks"].items():
+        base = baseline.get("benchmarks", {}).get(name)
+        if not base or not base["median_ms"]: continue
+        ratio = stats["median_ms"] / base["median_ms"]
+        if ratio > threshold: regressions[name] = ratio
+    return regressions
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark lineup generation and rendering.")
+    parser.add_argument('--repeats', type=int, default=20, help="timed runs per benchmark (default: 20)")
+    parser.add_argument('--output', help="write the results as JSON to this file (default: stdout)")
+    parser.add_argument('--baseline', help="compare against a results file and exit 1 on regressions")
+    parser.add_argument('--save-baseline', metavar="PATH", help="also save the results as the new baseline")
+    parser.add_argument('--threshold', type=float, default=REGRESSION_THRESHOLD,
+                        help=f"slowdown ratio that counts as a regression (default: {REGRESSION_THRESHOLD})")
+    parser.add_argument('--no-gui', action='store_true', help="only run the headless engine benchmarks")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    results = {"python": platform.python_version(), "platform": platform.platform(), "benchmarks": {}, "skipped": []}
+    run_benchmarks(engine_benchmarks(args.repeats), results["benchmarks"])
+
+    if not args.no_gui:
+        app, display = start_gui()
+        if app is None:
+            results["skipped"].append("gui (no display and pyvirtualdisplay is not installed)")
+            print("Skipping GUI benchmarks: no display available.", file=sys.stderr)
+        else:
+            try:
+                run_benchmarks(gui_benchmarks(app, args.repeats), results["benchmarks"])
+                results["image_cache"] = app.image_cache.stats()
+            finally:
+                app.win.destroy()
+                if display: display.stop()
+
+    text = json.dumps(results, indent=4)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f: f.write(text)
+    else:
+        print(text)
+    if args.save_baseline:
+        with open(args.save_baseline, 'w', encoding='utf-8') as f: f.write(text)
+
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            regressions = compare(results, json.load(f), args.threshold)
+        for name, ratio in regressions.items():
+            print(f"REGRESSION {name}: {ratio:.2f}x slower than baseline", file=sys.stderr)
+        if regressions: return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,127 @@
+# Operator icon sprite atlases: one sheet per display size and state, plus a JSON index of offsets.
+# Build them once (e.g. before packaging) so the app loads a few sheets instead of decoding every icon:
+#
+#   python icon_atlas.py --images images
+#
+# At runtime IconAtlas cuts per-operator PhotoImages out of the sheets with Tk's own photo copy, so no
+# PIL decode or resize is needed for icons that are in the atlas.
+import argparse
+import json
+import math
+import os
+import sys
+from tkinter import PhotoImage
+from PIL import Image, ImageOps
+from icon_index import IconIndex, icon_key
+
+ATLAS_DIR_NAME = "atlas"
+ATLAS_INDEX_NAME = "atlas.json"
+ATLAS_VERSION = 2 # 2: icons are keyed by icon_key instead of the raw file name
+# (size, greyscale) of every icon the GUI shows: the main display and the disable window's colour/grey states.
+ATLAS_VARIANTS = ((48, False), (64, False), (64, True))
+
+
+def variant_name(size, greyscale):
+    return f"{size}_grey" if greyscale else f"{size}"
+
+
+def render_icon(image_path, size, greyscale=False):
+    """Decodes and resizes one source icon exactly as the GUI displays it."""
+    with Image.open(image_path) as img:
+        img = img.resize(size, Image.Resampling.LANCZOS)
+        if greyscale: img = ImageOps.grayscale(img).convert('RGBA')
+        return img
+
+
+def source_stamp(image_path):
+    """Cheap identity of a source icon, used to notice icons replaced after the atlas was built."""
+    stat = os.stat(image_path)
+    return [stat.st_size, stat.st_mtime_ns]
+
+
+def build_atlas(image_dir, atlas_dir=None):
+    """Renders every icon in image_dir into one sheet per variant and writes the index. Returns the index."""
+    atlas_dir = atlas_dir or os.path.join(image_dir, ATLAS_DIR_NAME)
+    os.makedirs(atlas_dir, exist_ok=True)
+    icons = dict(IconIndex(image_dir)) # icon key -> path, sorted by key
+    columns = max(1, math.ceil(math.sqrt(len(icons))))
+    rows = max(1, math.ceil(len(icons) / columns))
+    index = {"version": ATLAS_VERSION, "sources": {}, "variants": {}}
+    for key, path in icons.items(): index["sources"][key] = source_stamp(path)
+
+    for size, greyscale in ATLAS_VARIANTS:
+        name = variant_name(size, greyscale)
+        sheet = Image.new('RGBA', (columns * size, rows * size), (0, 0, 0, 0))
+        offsets = {}
+        for i, (key, path) in enumerate(icons.items()):
+            row, col = divmod(i, columns)
+            offsets[key] = [col * size, row * size]
+            sheet.paste(render_icon(path, (size, size), greyscale).convert('RGBA'), tuple(offsets[key]))
+        filename = f"atlas_{name}.png"
+        sheet.save(os.path.join(atlas_dir, filename), optimize=True)
+        index["variants"][name] = {"file": filename, "size": size, "greyscale": greyscale, "icons": offsets}
+
+    with open(os.path.join(atlas_dir, ATLAS_INDEX_NAME), 'w', encoding='utf-8') as f:
+        json.dump(index, f, ensure_ascii=False, indent=1)
+    return index
+
+
+class IconAtlas:
+    """Runtime view of a built atlas; each sheet is loaded as one PhotoImage the first time it is needed."""
+    def __init__(self, image_dir, atlas_dir=None):
+        self.image_dir = image_dir
+        self.atlas_dir = atlas_dir or os.path.join(image_dir, ATLAS_DIR_NAME)
+        self.sheets = {}
+        try:
+            with open(os.path.join(self.atlas_dir, ATLAS_INDEX_NAME), 'r', encoding='utf-8') as f:
+                self.index = json.load(f)
+            if self.index.get("version") != ATLAS_VERSION: raise ValueError("old atlas version")
+        except (OSError, ValueError):
+            self.index = {"sources": {}, "variants": {}}
+        # A frozen build's bundled images are a read-only snapshot, and unpacking resets their mtimes.
+        self.check_sources = not getattr(sys, 'frozen', False)
+
+    def __bool__(self):
+        return bool(self.index["variants"])
+
+    def slice(self, op_name, size, greyscale=False, image_path=None):
+        """Returns a new PhotoImage of the operator's icon cut from the atlas, or None if it is missing or stale.
+
+        image_path is the current source icon, checked against the one the atlas was built from.
+        """
+        key = icon_key(op_name)
+        variant = self.index["variants"].get(variant_name(size, greyscale))
+        if not variant or key not in variant["icons"]: return None
+        if self.check_sources:
+            try:
+                if image_path is None or source_stamp(image_path) != self.index["sources"].get(key): return None
+            except OSError:
+                return None
+        sheet = self.sheets.get(variant["file"])
+        if sheet is None:
+            try: sheet = self.sheets[variant["file"]] = PhotoImage(file=os.path.join(self.atlas_dir, variant["file"]))
+            except Exception: return None # TclError for a missing or unreadable sheet
+        x, y = variant["icons"][key]
+        photo = PhotoImage(width=size, height=size)
+        photo.tk.call(photo, 'copy', sheet, '-from', x, y, x + size, y + size)
+        return photo
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Build the operator icon sprite atlases.")
+    parser.add_argument('--images', default=os.path.join(os.path.dirname(os.path.abspath(__file__)), 'images'),
+                        help="folder with the '<NAME> icon.png' files (default: images next to this script)")
+    parser.add_argument('--output', help="folder for the atlas sheets and index (default: <images>/atlas)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    index = build_atlas(args.images, args.output)
+    for name, variant in index["variants"].items():
+        print(f"{variant['file']}: {len(variant['icons'])} icons at {variant['size']}px")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,63 @@
+# Index of the "<NAME> icon.png" files in an image folder, so icon lookups are a dict hit instead of a failed open.
+# Keys are NFC-normalised, casefolded and whitespace-collapsed, so "JÄGER" finds "Jäger icon.png" (in either
+# Unicode form) and "AZAMI" finds "Azami  icon.png" on case-sensitive filesystems too.
+import os
+import unicodedata
+
+ICON_SUFFIX = " icon.png"
+
+
+def icon_key(name):
+    """Normalised lookup key for an operator or file name."""
+    return " ".join(unicodedata.normalize('NFC', name).casefold().split())
+
+
+class IconIndex:
+    """Maps operator names to icon paths from one os.scandir of the folder, refreshed incrementally."""
+    def __init__(self, image_dir):
+        self.image_dir = image_dir
+        self.files = {} # file name -> operator key, for every icon file seen by the last scan
+        self.candidates = {} # operator key -> {file name: path}; near-duplicates share a key
+        self.paths = {} # operator key -> chosen path
+        self.refresh()
+
+    def refresh(self):
+        """Rescans the folder and only re-keys the icon files that were added or removed since the last scan."""
+        try:
+            found = {entry.name: entry.path for entry in os.scandir(self.image_dir)
+                     if entry.is_file() and icon_key(entry.name).endswith(ICON_SUFFIX)}
+        except FileNotFoundError:
+            found = {}
+        for name in self.files.keys() - found.keys(): self._remove(name)
+        for name in found.keys() - self.files.keys(): self._add(name, found[name])
+
+    def _add(self, name, path):
+        key = icon_key(name)[:-len(ICON_SUFFIX)]
+        self.files[name] = key
+        self.candidates.setdefault(key, {})[name] = path
+        self._choose(key)
+
+    def _remove(self, name):
+        key = self.files.pop(name)
+        self.candidates[key].pop(name, None)
+        if not self.candidates[key]: del self.candidates[key]
+        self._choose(key)
+
+    def _choose(self, key):
+        """Prefers a cleanly named file (NFC, single spaces) over near-duplicates, then the first by name."""
+        names = self.candidates.get(key)
+        if not names:
+            self.paths.pop(key, None)
+            return
+        clean = lambda name: unicodedata.normalize('NFC', name) == name and "  " not in name
+        self.paths[key] = names[min(names, key=lambda name: (not clean(name), name))]
+
+    def resolve(self, op_name):
+        """Returns the icon path for an operator, or None if there is no icon for it."""
+        return self.paths.get(icon_key(op_name))
+
+    def __len__(self):
+        return len(self.paths)
+
+    def __iter__(self):
+        return iter(sorted(self.paths.items()))
@@ -0,0 +1,63 @@
+# Icons loaded in the background: PIL work runs on a small thread pool and finished pixel buffers are turned into
+# PhotoImages on the Tk thread in small after() batches, so the window never stalls while icons load.
+import os
+import queue
+from concurrent.futures import ThreadPoolExecutor
+from PIL import Image, ImageTk
+from icon_atlas import render_icon
+
+LOADER_WORKERS = min(4, os.cpu_count() or 1)
+BATCH_SIZE = 8 # PhotoImages created per main-thread tick
+POLL_MS = 15 # Delay between main-thread ticks while decodes are outstanding
+
+
+class BackgroundIconLoader:
+    """Decodes icons off the Tk thread and calls back with a PhotoImage (or None if the icon is missing)."""
+    def __init__(self, win, thumbnail_cache, workers=LOADER_WORKERS):
+        self.win = win
+        self.thumbnail_cache = thumbnail_cache
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='icon-loader')
+        self.finished = queue.SimpleQueue() # (key, PIL image or None) from the workers
+        self.waiting = {} # (path, size, greyscale) -> callbacks; a key is only decoded once at a time
+        self.pump_scheduled = False
+
+    def request(self, image_path, size, greyscale, callback):
+        key = (image_path, size, greyscale)
+        if key in self.waiting:
+            self.waiting[key].append(callback)
+            return
+        self.waiting[key] = [callback]
+        self.executor.submit(self._decode, key)
+        self._schedule_pump()
+
+    def _decode(self, key):
+        """Worker thread: reads the cached thumbnail (rendering it on a miss). Never touches Tk."""
+        image_path, size, greyscale = key
+        try:
+            thumbnail_path = self.thumbnail_cache.thumbnail(image_path, size, greyscale)
+            if thumbnail_path:
+                with Image.open(thumbnail_path) as img:
+                    image = img.copy()
+            else:
+                image = render_icon(image_path, (size, size), greyscale)
+        except Exception: # OSError for operators without an icon, but also PIL errors on a corrupt or huge file
+            image = None # Always post a result, or the key would stay in self.waiting and the pump would never stop
+        self.finished.put((key, image))
+
+    def _schedule_pump(self):
+        if self.pump_scheduled: return
+        self.pump_scheduled = True
+        self.win.after(POLL_MS, self._pump)
+
+    def _pump(self):
+        """Tk thread: converts up to BATCH_SIZE finished images and runs their callbacks."""
+        self.pump_scheduled = False
+        for _ in range(BATCH_SIZE):
+            try: key, image = self.finished.get_nowait()
+            except queue.Empty: break
+            photo = ImageTk.PhotoImage(image) if image is not None else None
+            for callback in self.waiting.pop(key, []): callback(photo)
+        if self.waiting: self._schedule_pump()
+
+    def shutdown(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,67 @@
+# One bounded cache for every operator PhotoImage the GUI shows, keyed by (operator, size, greyscale).
+# Least recently used images are evicted once the estimated pixel memory passes the byte budget. Widgets
+# keep their own reference to the image they show, so eviction never blanks an icon that is on screen.
+from collections import OrderedDict
+
+BYTES_PER_PIXEL = 4 # Tk photo images are stored as 32-bit RGBA
+
+
+def image_bytes(photo):
+    return photo.width() * photo.height() * BYTES_PER_PIXEL
+
+
+class ImageCache:
+    """LRU cache of PhotoImages bounded by budget_bytes, with hit/miss counters and per-operator invalidation."""
+    def __init__(self, budget_bytes):
+        self.budget_bytes = budget_bytes
+        self.entries = OrderedDict()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.generation = 0 # Bumped by clear()
+        self.op_versions = {} # op -> times invalidated, so loads started before an invalidation can be dropped
+
+    def __contains__(self, key):
+        return key in self.entries
+
+    def __len__(self):
+        return len(self.entries)
+
+    def get(self, key):
+        photo = self.entries.get(key)
+        if photo is None:
+            self.misses += 1
+            return None
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return photo
+
+    def put(self, key, photo):
+        if key in self.entries: self.bytes -= image_bytes(self.entries[key])
+        self.entries[key] = photo
+        self.entries.move_to_end(key)
+        self.bytes += image_bytes(photo)
+        # The newest entry always stays, even if it alone is over budget.
+        while self.bytes > self.budget_bytes and len(self.entries) > 1:
+            _, evicted = self.entries.popitem(last=False)
+            self.bytes -= image_bytes(evicted)
+            self.evictions += 1
+
+    def version(self, op):
+        return self.generation, self.op_versions.get(op, 0)
+
+    def invalidate(self, op):
+        """Drops every size and variant of one operator's icon (e.g. after the scraper downloads it again)."""
+        self.op_versions[op] = self.op_versions.get(op, 0) + 1
+        for key in [key for key in self.entries if key[0] == op]:
+            self.bytes -= image_bytes(self.entries.pop(key))
+
+    def clear(self):
+        self.generation += 1
+        self.entries.clear()
+        self.bytes = 0
+
+    def stats(self):
+        return {"entries": len(self.entries), "bytes": self.bytes, "budget_bytes": self.budget_bytes,
+                "hits": self.hits, "misses": self.misses, "evictions": self.evictions}
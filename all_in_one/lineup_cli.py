@@ -0,0 +1,89 @@
+# Command-line lineup generator: streams lineups as JSONL or CSV to stdout for use in shell pipelines.
+# Only depends on lineup_engine, so it never imports tkinter, PIL or keyboard.
+#
+#   python lineup_cli.py --count 1000 --mode Ranked --seed 42 --disabled "ASH,JÄGER" --format csv
+import argparse
+import csv
+import json
+import os
+import sys
+from lineup_engine import ROUND_COUNT, NO_BACKUP_MODES, LineupEngine, LineupError, load_roster
+
+DEFAULT_OPERATORS_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'operators_list.json')
+
+
+def iter_lineups(engine, mode, count):
+    """Lazily yields (seed, rounds, backups) so memory stays flat however many lineups are requested."""
+    for _ in range(count):
+        yield engine.generate(mode)
+
+
+def iter_jsonl(lineups, mode, roster_version):
+    for seed, rounds, backups in lineups:
+        yield json.dumps({"seed": seed, "mode": mode, "roster_version": roster_version,
+                          "rounds": rounds, "backups": backups}, ensure_ascii=False) + "\n"
+
+
+def csv_header(mode):
+    round_count = ROUND_COUNT[mode]
+    header = ["seed", "mode"]
+    header += [f"A{i+1}" for i in range(round_count)] + [f"D{i+1}" for i in range(round_count)]
+    if mode not in NO_BACKUP_MODES:
+        header += [f"BA{i+1}" for i in range(round_count)] + [f"BD{i+1}" for i in range(round_count)]
+    return header
+
+
+def iter_csv_rows(lineups, mode):
+    yield csv_header(mode)
+    for seed, rounds, backups in lineups:
+        yield [seed, mode, *rounds["attackers"], *rounds["defenders"], *backups["attackers"], *backups["defenders"]]
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Stream R6 operator lineups to stdout without starting the GUI.")
+    parser.add_argument('--count', type=int, default=1, help="number of lineups to generate (default: 1)")
+    parser.add_argument('--mode', choices=list(ROUND_COUNT), default="Ranked", help="round count preset (default: Ranked)")
+    parser.add_argument('--seed', type=int, default=None, help="seed for the whole run; each lineup's own seed is in the output")
+    parser.add_argument('--disabled', action='append', default=[], metavar="OPS",
+                        help="comma-separated operator names to disable (may be repeated)")
+    parser.add_argument('--format', choices=["jsonl", "csv"], default="jsonl", help="output format (default: jsonl)")
+    parser.add_argument('--allow-insufficient', action='store_true', help="allow repeats when too few operators are enabled")
+    parser.add_argument('--operators', default=DEFAULT_OPERATORS_FILE, help="path to operators_list.json")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    try:
+        attackers, defenders = load_roster(args.operators)
+    except (OSError, ValueError, TypeError) as e:
+        print(f"Error reading '{args.operators}': {e}", file=sys.stderr)
+        return 1
+
+    disabled = [op.strip().upper() for group in args.disabled for op in group.split(",") if op.strip()]
+    unknown = [op for op in disabled if op not in attackers and op not in defenders]
+    if unknown:
+        print(f"Unknown operator(s) in --disabled: {', '.join(unknown)}", file=sys.stderr)
+        return 2
+    engine = LineupEngine(attackers, defenders, disabled, allow_insufficient=args.allow_insufficient, seed=args.seed)
+    try:
+        engine.check_mode(args.mode)
+    except LineupError as e:
+        print(e, file=sys.stderr)
+        return 1
+
+    lineups = iter_lineups(engine, args.mode, args.count)
+    try:
+        if args.format == "jsonl":
+            sys.stdout.writelines(iter_jsonl(lineups, args.mode, engine.roster_version))
+        else:
+            csv.writer(sys.stdout, lineterminator="\n").writerows(iter_csv_rows(lineups, args.mode))
+        sys.stdout.flush()
+    except BrokenPipeError:
+        # The reader (e.g. `head`) went away; stop quietly like other shell tools.
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,901 @@
+# Tk-free lineup generation, shared by the GUI and any headless tooling (bots, brackets, scripts).
+# Nothing in here may import tkinter, PIL or keyboard.
+import random
+import json
+import hashlib
+from bisect import bisect_left
+from collections import deque
+
+# --- Optional imports for bulk generation ---
+# Only the vectorized sample_bulk path needs NumPy; everything else works without it.
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+# --- Configuration Constants ---
+ROUND_COUNT = {"Ranked": 9, "Unranked": 9, "Quick": 5, "Just Generate": 1}
+NO_BACKUP_MODES = {"Just Generate"}
+DEFAULT_WEIGHT = 1.0
+# Failed alias draws (already-picked operators) allowed per pick before falling back to an exact scan.
+MAX_ALIAS_MISSES = 32
+# How many past lineups count as "recent", and how recent operators are treated when avoiding repeats.
+RECENT_HISTORY_SIZE = 3
+RECENCY_POLICIES = ("exclude", "downweight")
+RECENCY_DOWNWEIGHT = 0.25
+# Weighted sides cannot use the exact exclusion, so "exclude" scales recent weights down this far instead.
+RECENCY_EXCLUDE_WEIGHT = 1e-9
+# Squad mode: players per stack, and how many search steps to try before declaring the constraints unsolvable.
+SQUAD_SIZE = 5
+SQUAD_SEARCH_LIMIT = 50000
+
+
+class LineupError(ValueError):
+    """Raised when a lineup cannot be generated with the current roster and disabled set."""
+
+
+def load_roster(filepath):
+    """Reads the ATTACKERS/DEFENDERS lists from the operators JSON file, standardized to uppercase."""
+    with open(filepath, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    attackers = data.get("ATTACKERS", [])
+    defenders = data.get("DEFENDERS", [])
+    if not isinstance(attackers, list) or not isinstance(defenders, list):
+        raise TypeError("ATTACKERS and DEFENDERS must be lists in the JSON file.")
+    return [op.upper() for op in attackers], [op.upper() for op in defenders]
+
+
+def empty_lineup():
+    """Returns the empty {"attackers": [], "defenders": []} structure used for rounds and backups."""
+    return {"attackers": [], "defenders": []}
+
+
+def bit_mask(indices):
+    """ORs the given operator indices into one integer bitmask."""
+    mask = 0
+    for i in indices: mask |= 1 << i
+    return mask
+
+
+def iter_bits(mask):
+    """Yields the operator indices set in a bitmask, lowest first."""
+    while mask:
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask ^= low
+
+
+def mask_to_hex(mask):
+    """Compact text form of a bitmask, for saving or sending over the wire."""
+    return format(mask, 'x')
+
+
+def mask_from_hex(text):
+    return int(text, 16) if text else 0
+
+
+def derive_seed(*parts):
+    """Deterministically mixes the given parts into a 64-bit seed."""
+    digest = hashlib.blake2b(repr(parts).encode('utf-8'), digest_size=8).digest()
+    return int.from_bytes(digest, 'little')
+
+
+def roster_version(attackers, defenders):
+    """Short fingerprint of a roster; a lineup is only reproducible against the same version."""
+    payload = json.dumps([attackers, defenders], ensure_ascii=False).encode('utf-8')
+    return hashlib.blake2b(payload, digest_size=6).hexdigest()
+
+
+class SeedStream:
+    """Counter-based stream of lineup seeds, one per consumer (GUI, server thread, bot...).
+
+    Seed n of a stream is derive_seed(stream seed, n), so a stream can jump ahead or be
+    split into independent child streams without touching any shared state or locks.
+    """
+
+    def __init__(self, seed=None):
+        self.seed = seed if seed is not None else random.SystemRandom().getrandbits(64)
+        self.counter = 0
+
+    def next_seed(self):
+        seed = derive_seed(self.seed, self.counter)
+        self.counter += 1
+        return seed
+
+    def jump(self, n):
+        """Skips the next n seeds."""
+        self.counter += n
+
+    def split(self, name):
+        """Returns an independent child stream; the same name always gives the same child."""
+        return SeedStream(derive_seed(self.seed, "split", name))
+
+
+class OperatorIndex:
+    """Gives every operator name an integer index, in roster order (attackers first, then defenders)."""
+
+    def __init__(self, names=()):
+        self.names = []
+        self.index = {}
+        for name in names: self.add(name)
+
+    def __len__(self): return len(self.names)
+
+    def add(self, name):
+        if name not in self.index:
+            self.index[name] = len(self.names)
+            self.names.append(name)
+        return self.index[name]
+
+    def mask(self, names):
+        """Bitmask of the given names (names not in the index are ignored)."""
+        index = self.index
+        return bit_mask(index[name] for name in names if name in index)
+
+    def names_in(self, mask):
+        return [self.names[i] for i in iter_bits(mask)]
+
+
+def pick_side(rng, enabled, round_count, with_backups=True):
+    """Picks one side's main list and backups from a sequence of enabled operator indices.
+
+    The main list is unique when the pool is big enough, otherwise it repeats. Backups come
+    from operators not in the main list, borrowing from the main list when those run short.
+    """
+    pool_size = len(enabled)
+    if pool_size < round_count:
+        main = rng.choices(enabled, k=round_count)
+        if not with_backups:
+            return main, []
+        main_mask = bit_mask(main)
+        backups = [i for i in enabled if not main_mask >> i & 1]
+    else:
+        # One draw covers both lists: the head is the main list, the tail is unused operators.
+        drawn = rng.sample(enabled, k=min(pool_size, 2 * round_count if with_backups else round_count))
+        main, backups = drawn[:round_count], drawn[round_count:]
+        if len(backups) == round_count or not with_backups:
+            return main, backups
+    backups.extend(rng.choices(main, k=round_count - len(backups)))
+    rng.shuffle(backups)
+    return main, backups
+
+
+class AliasTable:
+    """Vose alias table over operator indices: one weighted draw costs a single random() call."""
+
+    def __init__(self, items, weights):
+        n = len(items)
+        self.items = list(items)
+        self.weights = list(weights)
+        self.prob = [0.0] * n
+        self.alias = [0] * n
+        total = sum(self.weights)
+        scaled = [w * n / total for w in self.weights]
+        small = [i for i, p in enumerate(scaled) if p < 1.0]
+        large = [i for i, p in enumerate(scaled) if p >= 1.0]
+        while small and large:
+            s, l = small.pop(), large.pop()
+            self.prob[s], self.alias[s] = scaled[s], l
+            scaled[l] -= 1.0 - scaled[s]
+            (small if scaled[l] < 1.0 else large).append(l)
+        for i in small + large: self.prob[i] = 1.0
+
+    def __len__(self): return len(self.items)
+
+    def draw(self, rng):
+        r = rng.random() * len(self.items)
+        slot = int(r)
+        return self.items[slot] if r - slot < self.prob[slot] else self.items[self.alias[slot]]
+
+    def draw_distinct(self, rng, k, excluded_mask=0):
+        """Draws k different indices not in excluded_mask, weighted, by rejecting repeats.
+
+        If the remaining weight gets so small that rejections pile up, the rest is drawn with
+        an exact linear scan instead, so heavily skewed weights cannot stall generation.
+        """
+        picked, mask, misses = [], excluded_mask, 0
+        while len(picked) < k:
+            i = self.draw(rng)
+            if mask >> i & 1:
+                misses += 1
+                if misses > MAX_ALIAS_MISSES * k: break
+                continue
+            mask |= 1 << i
+            picked.append(i)
+        while len(picked) < k:
+            remaining = [(i, w) for i, w in zip(self.items, self.weights) if not mask >> i & 1]
+            i = rng.choices([i for i, _ in remaining], weights=[w for _, w in remaining])[0]
+            mask |= 1 << i
+            picked.append(i)
+        return picked
+
+
+def pick_side_avoiding(rng, fresh, stale, round_count, with_backups=True):
+    """pick_side that only uses stale (recently played) operators once the fresh ones run out."""
+    needed = round_count * 2 if with_backups else round_count
+    if len(fresh) >= needed or not stale:
+        return pick_side(rng, fresh, round_count, with_backups)
+    if len(fresh) + len(stale) < round_count:
+        return pick_side(rng, sorted(fresh + stale), round_count, with_backups)
+    drawn = rng.sample(fresh, k=len(fresh)) + rng.sample(stale, k=min(len(stale), needed - len(fresh)))
+    main, backups = drawn[:round_count], drawn[round_count:]
+    rng.shuffle(main) # Otherwise stale operators would always land in the last rounds
+    if with_backups:
+        backups.extend(rng.choices(main, k=round_count - len(backups)))
+        rng.shuffle(backups)
+    return main, backups
+
+
+def pick_side_bag(rng, bag, enabled, round_count, with_backups=True):
+    """pick_side for coverage mode: draws from the shuffle bag first and only then from a fresh cycle.
+
+    Returns (main, backups, wrapped): wrapped holds the main-list operators that had to come from
+    the next cycle because the bag ran out.
+    """
+    needed = round_count * 2 if with_backups else round_count
+    drawn = rng.sample(bag, k=min(len(bag), needed))
+    wrapped = []
+    if len(drawn) < needed:
+        drawn_mask = bit_mask(drawn)
+        others = [i for i in enabled if not drawn_mask >> i & 1]
+        extra = rng.sample(others, k=min(len(others), needed - len(drawn)))
+        wrapped = extra[:max(0, round_count - len(drawn))]
+        drawn += extra
+    main, backups = drawn[:round_count], drawn[round_count:]
+    if wrapped: rng.shuffle(main) # Otherwise the new cycle's operators would always land in the last rounds
+    if with_backups and len(backups) < round_count:
+        backups.extend(rng.choices(main, k=round_count - len(backups)))
+        rng.shuffle(backups)
+    return main, backups, wrapped
+
+
+def pick_side_weighted(rng, table, round_count, with_backups=True):
+    """Weighted counterpart of pick_side, drawing from an AliasTable of the enabled operators."""
+    pool_size = len(table)
+    if pool_size < round_count:
+        main = [table.draw(rng) for _ in range(round_count)]
+        if not with_backups:
+            return main, []
+        main_mask = bit_mask(main)
+        backups = [i for i in table.items if not main_mask >> i & 1]
+    else:
+        drawn = table.draw_distinct(rng, min(pool_size, 2 * round_count if with_backups else round_count))
+        main, backups = drawn[:round_count], drawn[round_count:]
+        if len(backups) == round_count or not with_backups:
+            return main, backups
+    backups.extend(rng.choices(main, k=round_count - len(backups)))
+    rng.shuffle(backups)
+    return main, backups
+
+
+def find_matching(candidates, rng=None):
+    """Bipartite matching of slots to operators (Kuhn's augmenting paths).
+
+    candidates is a list of operator bitmasks, one per slot. Returns a list with one distinct
+    operator index per slot, or None if no such assignment exists. With an rng the candidate
+    order is shuffled, so repeated calls give different valid matchings.
+    """
+    owner = {} # Operator index -> slot currently holding it
+    options = []
+    for mask in candidates:
+        ops = list(iter_bits(mask))
+        if rng is not None: rng.shuffle(ops)
+        options.append(ops)
+
+    def augment(slot, seen):
+        for op in options[slot]:
+            if op in seen: continue
+            seen.add(op)
+            if op not in owner or augment(owner[op], seen):
+                owner[op] = slot
+                return True
+        return False
+
+    order = list(range(len(candidates)))
+    if rng is not None: rng.shuffle(order)
+    for slot in order:
+        if not augment(slot, set()): return None
+    result = [None] * len(candidates)
+    for op, slot in owner.items(): result[slot] = op
+    return result
+
+
+def solve_squad_side(rng, domains, round_count, unique_per_player=True):
+    """Assigns every (round, player) cell an operator from that player's domain bitmask.
+
+    No operator repeats within a round and, with unique_per_player, no player gets the same operator
+    twice. Without that cross-round rule each round is an independent random matching; with it, a
+    depth-first search fills the most constrained cell first and, after every assignment, checks via
+    matchings that each round and each player can still be completed. Returns assignment[round][player],
+    or None if the constraints cannot be met. Raises LineupError if the search gives up after
+    SQUAD_SEARCH_LIMIT steps without deciding either way.
+    """
+    players = len(domains)
+    if not unique_per_player:
+        rounds = [find_matching(domains, rng) for _ in range(round_count)]
+        return None if any(r is None for r in rounds) else rounds
+
+    assignment = [[None] * players for _ in range(round_count)]
+    round_used = [0] * round_count
+    player_used = [0] * players
+    open_cells = {(r, p) for r in range(round_count) for p in range(players)}
+    steps = [0]
+
+    def candidates(r, p):
+        return domains[p] & ~round_used[r] & ~player_used[p]
+
+    def still_solvable():
+        for r in range(round_count):
+            slots = [candidates(r, p) for p in range(players) if assignment[r][p] is None]
+            if slots and find_matching(slots) is None: return False
+        for p in range(players):
+            slots = [candidates(r, p) for r in range(round_count) if assignment[r][p] is None]
+            if slots and find_matching(slots) is None: return False
+        return True
+
+    def search():
+        if not open_cells: return True
+        steps[0] += 1
+        if steps[0] > SQUAD_SEARCH_LIMIT:
+            raise LineupError(f"Squad search gave up after {SQUAD_SEARCH_LIMIT} steps; try again or loosen the disabled sets.")
+        r, p = min(open_cells, key=lambda cell: (candidates(*cell).bit_count(), rng.random()))
+        ops = list(iter_bits(candidates(r, p)))
+        rng.shuffle(ops)
+        open_cells.discard((r, p))
+        for op in ops:
+            bit = 1 << op
+            assignment[r][p] = op
+            round_used[r] |= bit
+            player_used[p] |= bit
+            if still_solvable() and search(): return True
+            assignment[r][p] = None
+            round_used[r] &= ~bit
+            player_used[p] &= ~bit
+        open_cells.add((r, p))
+        return False
+
+    if not still_solvable() or not search(): return None
+    return assignment
+
+
+class RecentHistory:
+    """Ring buffer of the operators in the last few lineups, with per-operator counts kept in step."""
+
+    def __init__(self, size=RECENT_HISTORY_SIZE):
+        self.entries = deque(maxlen=size)
+        self.counts = {} # Operator name -> number of entries it appears in; only names still in the window
+
+    def push(self, ops):
+        """Adds one lineup's operators and returns (names that became recent, names that stopped being recent)."""
+        if not self.entries.maxlen: return [], []
+        counts, entered, left = self.counts, [], []
+        if len(self.entries) == self.entries.maxlen:
+            for op in self.entries[0]:
+                counts[op] -= 1
+                if not counts[op]:
+                    del counts[op]
+                    left.append(op)
+        ops = list(dict.fromkeys(ops))
+        self.entries.append(ops)
+        for op in ops:
+            if op not in counts:
+                counts[op] = 0
+                entered.append(op)
+            counts[op] += 1
+        return entered, left
+
+    def clear(self):
+        self.entries.clear()
+        self.counts.clear()
+
+    def save(self, filepath):
+        with open(filepath, 'w', encoding='utf-8') as f:
+            json.dump({"size": self.entries.maxlen, "entries": list(self.entries)}, f, indent=4)
+
+    def load(self, filepath):
+        """Replaces the history with the one saved at filepath (keeping this buffer's size)."""
+        with open(filepath, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        self.clear()
+        for ops in data.get("entries", [])[-self.entries.maxlen:] if self.entries.maxlen else []:
+            self.push(ops)
+
+
+class OperatorPool:
+    """Enabled operator indices kept sorted, so sampling from it only depends on the enabled set.
+
+    Keeping the order canonical (rather than insertion order) is what makes a seed reproduce
+    the same lineup regardless of the order operators were toggled in.
+    """
+
+    def __init__(self, ops=()):
+        self.items = sorted(set(ops))
+
+    def __len__(self): return len(self.items)
+    def __getitem__(self, i): return self.items[i]
+
+    def __contains__(self, op):
+        i = bisect_left(self.items, op)
+        return i < len(self.items) and self.items[i] == op
+
+    def add(self, op):
+        i = bisect_left(self.items, op)
+        if i == len(self.items) or self.items[i] != op:
+            self.items.insert(i, op)
+
+    def remove(self, op):
+        i = bisect_left(self.items, op)
+        if i < len(self.items) and self.items[i] == op:
+            del self.items[i]
+
+
+def _index_dtype(pool_size):
+    """Smallest unsigned integer dtype that can index a pool of the given size."""
+    return np.uint8 if pool_size <= 0xFF else np.uint16 if pool_size <= 0xFFFF else np.uint32
+
+
+def _shuffle_rows(np_rng, arr):
+    """Independently shuffles every row of a 2D array."""
+    order = np.argsort(np_rng.random(arr.shape), axis=1)
+    return np.take_along_axis(arr, order, axis=1)
+
+
+def _partial_shuffle(np_rng, pool_size, n, m):
+    """n independent partial Fisher-Yates shuffles of range(pool_size); the first m columns are a uniform sample."""
+    perm = np.tile(np.arange(pool_size, dtype=_index_dtype(pool_size)), (n, 1))
+    flat, row_start = perm.reshape(-1), np.arange(n) * pool_size
+    for j in range(min(m, pool_size - 1)):
+        swap = row_start + np_rng.integers(j, pool_size, n)
+        column = perm[:, j].copy()
+        perm[:, j] = flat[swap]
+        flat[swap] = column
+    return perm
+
+
+def sample_bulk_side(np_rng, pool_size, round_count, n, with_backups=True, weights=None):
+    """Vectorized pick_side (or pick_side_weighted, if weights are given) for n lineups over a pool.
+
+    Returns (rounds, backups) as (n, round_count) integer arrays of positions in the pool;
+    backups is None when with_backups is False.
+    """
+    dtype = _index_dtype(pool_size)
+    rows = np.arange(n)[:, None]
+    if pool_size >= round_count:
+        # One random permutation per row: the head is the main list, the tail is everything unused.
+        # Only the columns that get used are shuffled. Exponential keys divided by the weights give
+        # weighted sampling without replacement.
+        if weights is None:
+            perm = _partial_shuffle(np_rng, pool_size, n, 2 * round_count if with_backups else round_count)
+        else:
+            perm = np.argsort(np_rng.exponential(size=(n, pool_size)) / weights, axis=1)
+        rounds = perm[:, :round_count]
+        if not with_backups:
+            return rounds.astype(dtype), None
+        rest = perm[:, round_count:]
+        if rest.shape[1] >= round_count:
+            return rounds.astype(dtype), rest[:, :round_count].astype(dtype)
+        # Every unused operator plus borrowed repeats from the main list, then shuffled.
+        borrowed = rounds[rows, np_rng.integers(0, round_count, (n, round_count - rest.shape[1]))]
+        backups = _shuffle_rows(np_rng, np.concatenate([rest, borrowed], axis=1))
+        return rounds.astype(dtype), backups.astype(dtype)
+
+    # Pool is smaller than the round count, so the main list repeats (random.choices).
+    if weights is None:
+        rounds = np_rng.integers(0, pool_size, (n, round_count))
+    else:
+        rounds = np_rng.choice(pool_size, size=(n, round_count), p=weights / weights.sum())
+    if not with_backups:
+        return rounds.astype(dtype), None
+    used = np.zeros((n, pool_size), dtype=bool)
+    used[rows, rounds] = True
+    # Unused operators sort first (in random order), used ones are pushed to the back.
+    keys = np_rng.random((n, pool_size)) + used
+    unused_first = np.argsort(keys, axis=1)
+    available = pool_size - used.sum(axis=1)
+    borrowed = rounds[rows, np_rng.integers(0, round_count, (n, round_count))]
+    padded = np.concatenate([unused_first, borrowed[:, pool_size:]], axis=1)
+    backups = np.where(np.arange(round_count)[None, :] < available[:, None], padded, borrowed)
+    return rounds.astype(dtype), _shuffle_rows(np_rng, backups).astype(dtype)
+
+
+def decode_bulk(bulk, i):
+    """Turns lineup i of a sample_bulk result back into (rounds, backups) of operator names."""
+    rounds, backups = empty_lineup(), empty_lineup()
+    for side in ("attackers", "defenders"):
+        pool = bulk["pools"][side]
+        rounds[side] = [pool[j] for j in bulk["rounds"][side][i]]
+        if bulk["backups"][side] is not None:
+            backups[side] = [pool[j] for j in bulk["backups"][side][i]]
+    return rounds, backups
+
+
+class LineupEngine:
+    """Generates rounds and backups from a roster and a disabled set, without any GUI.
+
+    An engine is not thread-safe: generating updates its last_* fields, the prefetch buffer and the
+    shuffle bags. Give each thread or worker its own engine, or guard a shared one with a lock.
+    """
+
+    def __init__(self, attackers, defenders, disabled_operators=(), allow_insufficient=False, seed=None):
+        self.operator_index = OperatorIndex()
+        self.disabled_mask = 0
+        self.allow_insufficient = allow_insufficient
+        self.seeds = SeedStream(seed)
+        self.last_seed = None
+        self.weights = {} # Operator name -> weight, only for operators that are not DEFAULT_WEIGHT
+        self._alias_tables = {} # side -> ((enabled mask, downweighted mask, factor), table), rebuilt only when one changes
+        self.history = RecentHistory()
+        self.recency_policy = None # None, or one of RECENCY_POLICIES
+        self.recent_mask = 0 # Operators in the history window, kept in step by remember()
+        self.last_avoid_mask = 0
+        self.coverage_mode = False # Shuffle-bag mode: everyone is played once before anyone repeats
+        self.played_mask = 0 # Operators already played in the current shuffle-bag cycle
+        self.last_played_mask = 0
+        self.state_version = 0 # Bumped on roster and weight changes; masks cover the rest of the state
+        self._prefetched = None # (state key, seed, avoid mask, lineup) from prefetch(), see generate()
+        self.last_from_prefetch = False
+        self.set_roster(attackers, defenders)
+        for op in disabled_operators: self.set_disabled(op, True)
+
+    def set_roster(self, attackers, defenders):
+        """Replaces the roster (e.g. after the scraper wrote a new operators file) and rebuilds the pools.
+
+        Operators are renumbered in the new roster order; disabled operators stay disabled by name.
+        """
+        disabled, played = self.disabled_operators, self.operator_index.names_in(self.played_mask)
+        self.attackers = list(attackers)
+        self.defenders = list(defenders)
+        self.state_version += 1
+        self.roster_version = roster_version(self.attackers, self.defenders)
+        self.operator_index = index = OperatorIndex(self.attackers + self.defenders)
+        self.disabled_mask = index.mask(disabled)
+        self.played_mask = index.mask(played)
+        self.roster_mask = {"attackers": bit_mask(index.add(op) for op in self.attackers),
+                            "defenders": bit_mask(index.add(op) for op in self.defenders)}
+        self._rebuild_pools()
+        self.weighted_mask = index.mask(self.weights)
+        self.recent_mask = index.mask(self.history.counts)
+        self._alias_tables.clear()
+
+    def _rebuild_pools(self):
+        # Kept up to date by set_disabled so generation never has to filter the roster.
+        self.enabled = {side: OperatorPool(iter_bits(mask & ~self.disabled_mask)) for side, mask in self.roster_mask.items()}
+        # The shuffle bags: enabled operators not yet played in the current cycle.
+        self.bags = {side: OperatorPool(iter_bits(mask & ~self.disabled_mask & ~self.played_mask)) for side, mask in self.roster_mask.items()}
+
+    @property
+    def disabled_operators(self):
+        """The disabled operator names, decoded from the disabled mask."""
+        return set(self.operator_index.names_in(self.disabled_mask))
+
+    def is_disabled(self, op):
+        i = self.operator_index.index.get(op)
+        return i is not None and bool(self.disabled_mask >> i & 1)
+
+    def set_disabled(self, op, disabled):
+        """Disables or re-enables a single operator."""
+        i = self.operator_index.index.get(op)
+        if i is None: return
+        bit = 1 << i
+        if disabled:
+            self.disabled_mask |= bit
+            for side in self.roster_mask:
+                self.enabled[side].remove(i)
+                self.bags[side].remove(i)
+        else:
+            self.disabled_mask &= ~bit
+            for side, mask in self.roster_mask.items():
+                if mask & bit:
+                    self.enabled[side].add(i)
+                    if not self.played_mask & bit: self.bags[side].add(i)
+
+    def toggle_disabled(self, op):
+        """Flips the disabled state of an operator and returns the new state."""
+        disabled = not self.is_disabled(op)
+        self.set_disabled(op, disabled)
+        return disabled
+
+    def set_side_disabled(self, side, mask):
+        """Replaces one side's disabled operators with the bits of mask in a single batch.
+
+        The pools are rebuilt once however many operators change. Returns the mask of operators that changed.
+        """
+        side_mask = self.roster_mask[side]
+        mask &= side_mask
+        changed = (self.disabled_mask ^ mask) & side_mask
+        if changed:
+            self.disabled_mask = self.disabled_mask & ~side_mask | mask
+            self._rebuild_pools()
+        return changed
+
+    def enabled_count(self, side):
+        # The enabled pools are kept in step with every toggle, so this is a plain length.
+        return len(self.enabled[side])
+
+    def weight(self, op):
+        return self.weights.get(op, DEFAULT_WEIGHT)
+
+    def set_weight(self, op, weight):
+        """Sets how likely an operator is to be picked relative to the others (default 1.0)."""
+        if weight <= 0:
+            raise ValueError("Operator weights must be positive; disable the operator instead.")
+        if weight == DEFAULT_WEIGHT: self.weights.pop(op, None)
+        else: self.weights[op] = float(weight)
+        self.state_version += 1
+        i = self.operator_index.index.get(op)
+        if i is not None:
+            self.weighted_mask = self.weighted_mask | 1 << i if op in self.weights else self.weighted_mask & ~(1 << i)
+        self._alias_tables.clear()
+
+    def set_weights(self, weights):
+        """Replaces all weights at once (a dict of operator name -> weight)."""
+        for op in list(self.weights): self.set_weight(op, DEFAULT_WEIGHT)
+        for op, weight in weights.items(): self.set_weight(op, weight)
+
+    def alias_table(self, side, downweighted_mask=0, factor=RECENCY_DOWNWEIGHT):
+        """Alias table of the enabled operators on a side, cached until weights or the enabled set change.
+
+        Operators in downweighted_mask have their weight multiplied by factor.
+        """
+        enabled_mask = self.roster_mask[side] & ~self.disabled_mask
+        downweighted_mask &= enabled_mask
+        key = (enabled_mask, downweighted_mask, factor)
+        cached = self._alias_tables.get(side)
+        if cached is None or cached[0] != key:
+            names, items = self.operator_index.names, self.enabled[side].items
+            weights = [self.weight(names[i]) * (factor if downweighted_mask >> i & 1 else 1.0) for i in items]
+            cached = self._alias_tables[side] = (key, AliasTable(items, weights))
+        return cached[1]
+
+    def remember(self, rounds):
+        """Adds a generated lineup to the recency history, updating recent_mask only for operators that enter or leave it."""
+        entered, left = self.history.push(rounds["attackers"] + rounds["defenders"])
+        index = self.operator_index.index
+        for op in left:
+            if op in index: self.recent_mask &= ~(1 << index[op])
+        for op in entered:
+            if op in index: self.recent_mask |= 1 << index[op]
+
+    def load_history(self, filepath):
+        """Loads a saved recency history; a missing or unreadable file just starts an empty one."""
+        try:
+            self.history.load(filepath)
+        except (OSError, ValueError, TypeError, KeyError):
+            self.history.clear()
+        self.recent_mask = self.operator_index.mask(self.history.counts)
+
+    def save_history(self, filepath):
+        self.history.save(filepath)
+
+    def export_disabled(self):
+        """Disabled state as "<roster version>:<hex bitmask>"; the bits are only meaningful for that roster."""
+        return f"{self.roster_version}:{mask_to_hex(self.disabled_mask)}"
+
+    def import_disabled(self, text):
+        """Restores a disabled state produced by export_disabled.
+
+        Raises LineupError if it was exported for a different roster, since operators are renumbered
+        on every set_roster. Bits outside the roster are dropped.
+        """
+        version, _, mask_text = text.rpartition(":")
+        if version and version != self.roster_version:
+            raise LineupError(f"Disabled state is for roster {version}, not the current roster {self.roster_version}.")
+        self.disabled_mask = mask_from_hex(mask_text) & (self.roster_mask["attackers"] | self.roster_mask["defenders"])
+        self._rebuild_pools()
+
+    def set_played_mask(self, mask):
+        """Restores the shuffle-bag cycle state (operators already played this cycle)."""
+        self.played_mask = mask
+        self._rebuild_pools()
+
+    def load_bag(self, filepath):
+        """Loads the saved shuffle-bag cycle; a missing or unreadable file starts a fresh cycle."""
+        try:
+            with open(filepath, 'r', encoding='utf-8') as f:
+                played = json.load(f).get("played", [])
+        except (OSError, ValueError, AttributeError):
+            played = []
+        self.set_played_mask(self.operator_index.mask(played))
+
+    def save_bag(self, filepath):
+        """Saves the shuffle-bag cycle by operator name, so it survives roster updates."""
+        with open(filepath, 'w', encoding='utf-8') as f:
+            json.dump({"played": self.operator_index.names_in(self.played_mask)}, f, indent=4)
+
+    def check_mode(self, mode):
+        """Raises LineupError if the enabled pools cannot fill the given mode."""
+        round_count = ROUND_COUNT.get(mode, 0)
+        attacker_count, defender_count = self.enabled_count("attackers"), self.enabled_count("defenders")
+        if not attacker_count or not defender_count:
+            raise LineupError("Cannot generate with zero enabled attackers or defenders.")
+        if not self.allow_insufficient and (attacker_count < round_count or defender_count < round_count):
+            raise LineupError(f"Not enough enabled operators for mode '{mode}'!")
+
+    def _generate_unchecked(self, mode, seed, avoid_mask=0):
+        rng, names, policy = random.Random(seed), self.operator_index.names, self.recency_policy
+        round_count = ROUND_COUNT.get(mode, 0)
+        with_backups = mode not in NO_BACKUP_MODES
+        rounds, backups = empty_lineup(), empty_lineup()
+        for side in ("attackers", "defenders"):
+            enabled_mask = self.roster_mask[side] & ~self.disabled_mask
+            avoid = avoid_mask & enabled_mask
+            if enabled_mask & self.weighted_mask or (avoid and policy == "downweight"):
+                factor = RECENCY_EXCLUDE_WEIGHT if policy == "exclude" else RECENCY_DOWNWEIGHT
+                main, backup = pick_side_weighted(rng, self.alias_table(side, avoid, factor), round_count, with_backups)
+            elif avoid:
+                items = self.enabled[side].items
+                fresh = [i for i in items if not avoid >> i & 1]
+                stale = [i for i in items if avoid >> i & 1]
+                main, backup = pick_side_avoiding(rng, fresh, stale, round_count, with_backups)
+            else:
+                main, backup = pick_side(rng, self.enabled[side].items, round_count, with_backups)
+            rounds[side], backups[side] = [names[i] for i in main], [names[i] for i in backup]
+        return rounds, backups
+
+    def _generate_coverage(self, mode, seed):
+        """Shuffle-bag generation: consumes the main list from the bags and starts new cycles as they empty."""
+        rng, names = random.Random(seed), self.operator_index.names
+        round_count = ROUND_COUNT.get(mode, 0)
+        with_backups = mode not in NO_BACKUP_MODES
+        rounds, backups = empty_lineup(), empty_lineup()
+        for side in ("attackers", "defenders"):
+            bag, enabled = self.bags[side], self.enabled[side]
+            if len(enabled) < round_count:
+                main, backup = pick_side(rng, enabled.items, round_count, with_backups) # Repeats are unavoidable
+            else:
+                main, backup, wrapped = pick_side_bag(rng, bag.items, enabled.items, round_count, with_backups)
+                for i in main:
+                    bag.remove(i)
+                    self.played_mask |= 1 << i
+                if wrapped or not bag:
+                    # Start the next cycle; operators taken from it in this lineup already count as played.
+                    side_mask = self.roster_mask[side]
+                    self.played_mask = self.played_mask & ~side_mask | bit_mask(wrapped)
+                    self.bags[side] = OperatorPool(iter_bits(side_mask & ~self.disabled_mask & ~self.played_mask))
+            rounds[side], backups[side] = [names[i] for i in main], [names[i] for i in backup]
+        return rounds, backups
+
+    def _state_key(self, mode):
+        """Everything a lineup depends on besides its seed; a prefetched lineup is only valid while this matches."""
+        return (mode, self.state_version, self.disabled_mask, self.recent_mask if self.recency_policy else 0,
+                self.allow_insufficient, self.recency_policy)
+
+    def prefetch(self, mode):
+        """Generates the next lineup for mode ahead of time (e.g. at idle), for generate to hand out instantly.
+
+        Nothing is prefetched in coverage mode, since drawing ahead would consume the shuffle bag.
+        """
+        self._prefetched = None
+        if self.coverage_mode: return
+        try:
+            self.check_mode(mode)
+        except LineupError:
+            return
+        seed = self.seeds.next_seed()
+        avoid_mask = self.recent_mask if self.recency_policy else 0
+        self._prefetched = (self._state_key(mode), seed, avoid_mask, self._generate_unchecked(mode, seed, avoid_mask))
+
+    def has_prefetched(self, mode):
+        return self._prefetched is not None and self._prefetched[0] == self._state_key(mode)
+
+    def generate(self, mode, seed=None, stream=None):
+        """Generates one lineup for the mode and returns (seed, rounds, backups), like generate_batch.
+
+        The lineup is fully determined by its seed plus the roster version and disabled state
+        (see lineup_record). Without an explicit seed the next one is taken from stream, or from
+        the engine's own stream; use seeds.split() for independent, reproducible sub-streams.
+        If prefetch() already made a lineup for this mode and nothing changed since, that one is
+        returned without any sampling.
+        """
+        self.check_mode(mode)
+        self.last_from_prefetch = seed is None and stream is None and not self.coverage_mode and self.has_prefetched(mode)
+        if self.last_from_prefetch:
+            _, self.last_seed, self.last_avoid_mask, lineup = self._prefetched
+            self._prefetched = None
+            self.last_played_mask = self.played_mask
+            return (self.last_seed, *lineup)
+        if seed is None: seed = (stream or self.seeds).next_seed()
+        self.last_seed = seed
+        self.last_avoid_mask = self.recent_mask if self.recency_policy else 0
+        self.last_played_mask = self.played_mask
+        if self.coverage_mode:
+            return (seed, *self._generate_coverage(mode, seed))
+        return (seed, *self._generate_unchecked(mode, seed, self.last_avoid_mask))
+
+    def generate_batch(self, mode, n, stream=None, records=False):
+        """Generates n lineups for the mode in one call and returns a list of (seed, rounds, backups).
+
+        The whole batch avoids the same recent operators, since nothing is remembered in between.
+        With records, each entry also carries its lineup_record, so any lineup of the batch can be
+        replayed on its own.
+        """
+        self.check_mode(mode)
+        next_seed, generate_unchecked = (stream or self.seeds).next_seed, self._generate_unchecked
+        if self.coverage_mode: generate_unchecked = lambda mode, seed, avoid_mask: self._generate_coverage(mode, seed)
+        avoid_mask = self.last_avoid_mask = self.recent_mask if self.recency_policy else 0
+        batch = []
+        for _ in range(n):
+            seed = self.last_seed = next_seed()
+            self.last_played_mask = self.played_mask # Coverage mode advances it with every lineup
+            lineup = (seed, *generate_unchecked(mode, seed, avoid_mask))
+            if records: lineup += (self.lineup_record(mode, seed, avoid_mask),)
+            batch.append(lineup)
+        return batch
+
+    def generate_squad(self, player_disabled, mode, unique_per_player=True, seed=None, stream=None):
+        """Generates one lineup per player for a stack, with no operator repeated within a round.
+
+        player_disabled holds each player's own disabled operator names (on top of the engine's
+        disabled set); its length is the squad size, 1 to SQUAD_SIZE players. With unique_per_player, no player gets the same
+        operator in two rounds either. Returns a list of per-player rounds dicts, in the same
+        {"attackers", "defenders"} shape generate uses. Squads have no backups.
+        """
+        if mode not in ROUND_COUNT:
+            raise LineupError(f"Unknown mode '{mode}'.")
+        if not 1 <= len(player_disabled) <= SQUAD_SIZE:
+            raise LineupError(f"A squad has 1 to {SQUAD_SIZE} players, not {len(player_disabled)}.")
+        if seed is None: seed = (stream or self.seeds).next_seed()
+        self.last_seed = seed
+        rng, names = random.Random(seed), self.operator_index.names
+        round_count = ROUND_COUNT.get(mode, 0)
+        player_masks = [self.disabled_mask | self.operator_index.mask(disabled) for disabled in player_disabled]
+        squad = [empty_lineup() for _ in player_masks]
+        for side in ("attackers", "defenders"):
+            domains = [self.roster_mask[side] & ~mask for mask in player_masks]
+            assignment = solve_squad_side(rng, domains, round_count, unique_per_player)
+            if assignment is None:
+                raise LineupError(f"Cannot give every player different {side} each round for mode '{mode}' with these disabled sets.")
+            for p, lineup in enumerate(squad):
+                lineup[side] = [names[assignment[r][p]] for r in range(round_count)]
+        return squad
+
+    def lineup_record(self, mode, seed=None, avoid_mask=None):
+        """Everything needed to regenerate a lineup later with replay_lineup (defaults to the last one).
+
+        A lineup generated before the last one also needs the avoid mask it was generated with.
+        """
+        if avoid_mask is None: avoid_mask = self.last_avoid_mask
+        return {"mode": mode, "seed": self.last_seed if seed is None else seed, "roster_version": self.roster_version,
+                "disabled": self.export_disabled(), "allow_insufficient": self.allow_insufficient,
+                "weights": dict(self.weights), "recency": self.recency_policy, "avoid": mask_to_hex(avoid_mask),
+                "coverage": self.coverage_mode, "played": mask_to_hex(self.last_played_mask)}
+
+    def sample_bulk(self, mode, n, seed=None, stream=None):
+        """Vectorized version of generate_batch for very large batches (needs NumPy).
+
+        Returns {"seed", "pools", "rounds", "backups"}: pools holds the enabled operator names per
+        side, rounds/backups hold (n, round_count) integer arrays indexing into those pools. The
+        whole batch is reproducible from its seed. The recency window and coverage mode cannot be
+        vectorized this way, so LineupError is raised while either is on; use generate_batch then.
+        """
+        if not NUMPY_AVAILABLE:
+            raise RuntimeError("NumPy is required for bulk sampling.")
+        if self.recency_policy or self.coverage_mode:
+            raise LineupError("Bulk sampling ignores the recency window and coverage mode; use generate_batch instead.")
+        self.check_mode(mode)
+        if seed is None: seed = (stream or self.seeds).next_seed()
+        np_rng = np.random.default_rng(seed)
+        round_count = ROUND_COUNT.get(mode, 0)
+        with_backups = mode not in NO_BACKUP_MODES
+        names = self.operator_index.names
+        bulk = {"seed": seed, "pools": {side: [names[i] for i in pool.items] for side, pool in self.enabled.items()}, "rounds": {}, "backups": {}}
+        for side, pool in bulk["pools"].items():
+            weights = np.array([self.weight(op) for op in pool]) if self.roster_mask[side] & ~self.disabled_mask & self.weighted_mask else None
+            bulk["rounds"][side], bulk["backups"][side] = sample_bulk_side(np_rng, len(pool), round_count, n, with_backups, weights)
+        return bulk
+
+
+def replay_lineup(attackers, defenders, record):
+    """Regenerates the lineup described by a lineup_record against the given roster."""
+    engine = LineupEngine(attackers, defenders, allow_insufficient=record["allow_insufficient"])
+    if engine.roster_version != record["roster_version"]:
+        raise LineupError(f"Roster version {engine.roster_version} does not match the record ({record['roster_version']}).")
+    engine.import_disabled(record["disabled"])
+    engine.set_weights(record.get("weights", {}))
+    engine.recency_policy = record.get("recency")
+    engine.recent_mask = mask_from_hex(record.get("avoid", ""))
+    engine.coverage_mode = record.get("coverage", False)
+    engine.set_played_mask(mask_from_hex(record.get("played", "")))
+    _, rounds, backups = engine.generate(record["mode"], seed=record["seed"])
+    return rounds, backups
@@ -0,0 +1,170 @@
+# Monte Carlo fairness check for lineup generation: per-operator pick frequencies, chi-square against a
+# uniform pick and duplicate rates, for every mode and enabled-pool size. Needs NumPy.
+# Picks inside one lineup are not independent (no repeats, borrowed backups), so the chi-square only looks
+# at the first slot of the rounds and of the backups: one independent draw per lineup.
+#
+#   python lineup_stats.py --lineups 1000000 --modes Ranked Quick --sizes 3 9 12 38 --json
+import argparse
+import json
+import math
+import sys
+import time
+from lineup_engine import ROUND_COUNT, NO_BACKUP_MODES, NUMPY_AVAILABLE, LineupEngine, sample_bulk_side
+
+if NUMPY_AVAILABLE:
+    import numpy as np
+
+# Lineups simulated per vectorized call; bounds the memory of one sweep step.
+CHUNK_SIZE = 200_000
+# Default pool sizes: around every round count boundary (k and 2k, where backups start borrowing) plus the full roster.
+DEFAULT_SIZES = [1, 2, 3, 4, 5, 6, 9, 10, 12, 17, 18, 19, 25, 38]
+
+
+def group_modes(modes):
+    """Merges modes that sample identically (same round count and backups) into one "A/B" label."""
+    groups = {}
+    for mode in modes:
+        groups.setdefault((ROUND_COUNT[mode], mode in NO_BACKUP_MODES), []).append(mode)
+    return [("/".join(group), group[0]) for group in groups.values()]
+
+
+def chi_square(counts):
+    """Chi-square statistic of the counts against a uniform spread, plus its degrees of freedom."""
+    expected = counts.sum() / len(counts)
+    if len(counts) < 2 or expected == 0: return 0.0, 0
+    return float(((counts - expected) ** 2 / expected).sum()), len(counts) - 1
+
+
+def has_repeat(rows):
+    """Per-row flag: does the row contain the same operator twice?"""
+    ordered = np.sort(rows, axis=1)
+    return (ordered[:, 1:] == ordered[:, :-1]).any(axis=1)
+
+
+def simulate(mode, pool_size, lineups, np_rng, chunk_size=CHUNK_SIZE):
+    """Runs the vectorized sampler for one (mode, pool size) configuration and returns its statistics."""
+    round_count = ROUND_COUNT[mode]
+    with_backups = mode not in NO_BACKUP_MODES
+    main_counts, backup_counts = np.zeros(pool_size, dtype=np.int64), np.zeros(pool_size, dtype=np.int64)
+    main_slot, backup_slot = np.zeros(pool_size, dtype=np.int64), np.zeros(pool_size, dtype=np.int64)
+    main_repeats = backup_repeats = overlaps = 0
+    done = 0
+    while done < lineups:
+        n = min(chunk_size, lineups - done)
+        rounds, backups = sample_bulk_side(np_rng, pool_size, round_count, n, with_backups)
+        main_counts += np.bincount(rounds.ravel(), minlength=pool_size)
+        main_slot += np.bincount(rounds[:, 0], minlength=pool_size)
+        main_repeats += int(has_repeat(rounds).sum()) if round_count > 1 else 0
+        if with_backups:
+            backup_counts += np.bincount(backups.ravel(), minlength=pool_size)
+            backup_slot += np.bincount(backups[:, 0], minlength=pool_size)
+            backup_repeats += int(has_repeat(backups).sum()) if round_count > 1 else 0
+            used = np.zeros((n, pool_size), dtype=bool)
+            used[np.arange(n)[:, None], rounds] = True
+            overlaps += int(np.take_along_axis(used, backups.astype(np.intp), axis=1).any(axis=1).sum())
+        done += n
+    return summarize(mode, pool_size, lineups, (main_counts, main_slot), (backup_counts, backup_slot) if with_backups else None,
+                     main_repeats, backup_repeats, overlaps)
+
+
+def summarize(mode, pool_size, lineups, main, backup, main_repeats, backup_repeats, overlaps):
+    """main and backup are (counts over every slot, counts of the first slot only); backup is None without backups."""
+    stats = {"mode": mode, "pool_size": pool_size, "lineups": lineups}
+    for name, counts in (("main", main), ("backup", backup)):
+        if counts is None: continue
+        counts, slot_counts = counts
+        chi2, dof = chi_square(slot_counts)
+        freqs = counts / counts.sum()
+        stats[name] = {
+            "frequencies": freqs.tolist(),
+            "min_frequency": float(freqs.min()), "max_frequency": float(freqs.max()),
+            "chi_square": chi2, "dof": dof,
+            # Normal approximation of the first-slot chi-square tail: |z| above ~3 means that slot is not uniform.
+            "z": (chi2 - dof) / math.sqrt(2 * dof) if dof else 0.0,
+        }
+    stats["main_repeat_rate"] = main_repeats / lineups
+    if backup is not None:
+        stats["backup_repeat_rate"] = backup_repeats / lineups
+        stats["backup_overlap_rate"] = overlaps / lineups
+    return stats
+
+
+def reference_stats(mode, pool_size, lineups, seed=None):
+    """Same statistics from the exact (non-vectorized) engine path, to cross-check the simulator."""
+    ops = [f"OP{i}" for i in range(pool_size)]
+    engine = LineupEngine(ops, ops, allow_insufficient=True, seed=seed)
+    position = {op: i for i, op in enumerate(ops)}
+    main_counts, backup_counts = np.zeros(pool_size, dtype=np.int64), np.zeros(pool_size, dtype=np.int64)
+    main_slot, backup_slot = np.zeros(pool_size, dtype=np.int64), np.zeros(pool_size, dtype=np.int64)
+    main_repeats = backup_repeats = overlaps = 0
+    for _, rounds, backups in engine.generate_batch(mode, lineups):
+        main, backup = rounds["attackers"], backups["attackers"]
+        for op in main: main_counts[position[op]] += 1
+        for op in backup: backup_counts[position[op]] += 1
+        main_slot[position[main[0]]] += 1
+        if backup: backup_slot[position[backup[0]]] += 1
+        main_repeats += len(set(main)) < len(main)
+        backup_repeats += len(set(backup)) < len(backup)
+        overlaps += bool(set(main) & set(backup))
+    with_backups = mode not in NO_BACKUP_MODES
+    return summarize(mode, pool_size, lineups, (main_counts, main_slot), (backup_counts, backup_slot) if with_backups else None,
+                     main_repeats, backup_repeats, overlaps)
+
+
+def sweep(modes, sizes, lineups, seed=None):
+    """Yields (mode, statistics) for every distinct mode x pool size combination."""
+    np_rng = np.random.default_rng(seed)
+    for label, mode in group_modes(modes):
+        for pool_size in sizes:
+            stats = simulate(mode, pool_size, lineups, np_rng)
+            stats["mode"] = label
+            yield mode, stats
+
+
+def format_row(stats):
+    main = stats["main"]
+    row = (f"{stats['mode']:<14}{stats['pool_size']:>5}  main chi2/dof {main['chi_square']:>9.1f}/{main['dof']:<3}"
+           f" z {main['z']:>6.2f}  freq {main['min_frequency']:.4f}-{main['max_frequency']:.4f}"
+           f"  repeats {stats['main_repeat_rate']:.4f}")
+    if "backup" in stats:
+        backup = stats["backup"]
+        row += (f" | backup z {backup['z']:>6.2f}  freq {backup['min_frequency']:.4f}-{backup['max_frequency']:.4f}"
+                f"  repeats {stats['backup_repeat_rate']:.4f}  overlap {stats['backup_overlap_rate']:.4f}")
+    return row
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Measure how evenly lineup generation picks operators.")
+    parser.add_argument('--lineups', type=int, default=1_000_000, help="lineups per configuration (default: 1000000)")
+    parser.add_argument('--modes', nargs='+', choices=list(ROUND_COUNT), default=list(ROUND_COUNT))
+    parser.add_argument('--sizes', nargs='+', type=int, default=DEFAULT_SIZES,
+                        help="enabled-pool sizes to test (default: the round count boundaries and a full roster)")
+    parser.add_argument('--seed', type=int, default=None)
+    parser.add_argument('--reference', type=int, default=0, metavar="N",
+                        help="also run N lineups through the exact engine path for comparison")
+    parser.add_argument('--json', action='store_true', help="print JSON lines instead of a table")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    if not NUMPY_AVAILABLE:
+        print("NumPy is required for the fairness simulator.", file=sys.stderr)
+        return 1
+    args = parse_args(argv)
+    start = time.perf_counter()
+    for mode, stats in sweep(args.modes, args.sizes, args.lineups, args.seed):
+        if args.json:
+            print(json.dumps(stats))
+        else:
+            print(format_row(stats))
+        if args.reference:
+            reference = reference_stats(mode, stats["pool_size"], args.reference, args.seed)
+            reference["mode"] = stats["mode"]
+            print(json.dumps({"reference": reference}) if args.json else "  reference   " + format_row(reference))
+    if not args.json:
+        print(f"Finished in {time.perf_counter() - start:.1f}s", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,6 +1,6 @@
 # Import necessary libraries
-import random
-from tkinter import Tk, Frame, Label, Button, Toplevel, messagebox, BooleanVar, Checkbutton
+from tkinter import Tk, Frame, Label, Button, Toplevel, Canvas, PhotoImage, messagebox, BooleanVar, Checkbutton
+from tkinter import font as tkfont
 import keyboard
 import os
 import sys
@@ -9,6 +9,12 @@ import json
 from PIL import Image, ImageTk, ImageOps
 import threading
 import time
+from lineup_engine import ROUND_COUNT, LineupEngine, LineupError, load_roster, empty_lineup
+from icon_atlas import IconAtlas, render_icon
+from icon_index import IconIndex
+from thumbnail_cache import ThumbnailCache
+from icon_loader import BackgroundIconLoader
+from image_cache import ImageCache
 
 # --- Optional imports for the scraper functionality ---
 # The application can run without these, but the update feature will be disabled.
@@ -40,9 +46,19 @@ def resource_path(relative_path):
 
     return os.path.join(base_path, relative_path)
 
-# --- Path Constants (using the helper function) ---
+def user_data_path(relative_path):
+    """ Get a writable path for state that must survive restarts (next to the .exe when frozen, since
+    PyInstaller's --onefile temp folder is deleted on exit) """
+    if getattr(sys, 'frozen', False): base_path = os.path.dirname(sys.executable)
+    else: base_path = os.path.dirname(os.path.abspath(__file__))
+    return os.path.join(base_path, relative_path)
+
+# --- Path Constants (bundled resources via resource_path, user state via user_data_path) ---
 OPERATORS_FILE = resource_path('operators_list.json')
+HISTORY_FILE = user_data_path('lineup_history.json')
+BAG_FILE = user_data_path('shuffle_bag.json')
 IMAGE_DIR = resource_path('images')
+THUMBNAIL_CACHE_DIR = user_data_path('thumbnail_cache')
 
 
 # --- SCRAPER HELPER FUNCTIONS ---
@@ -138,6 +154,7 @@ def extract_operators_with_selenium(driver, url, role_name):
 
 # --- GUI Styling Constants ---
 FONT_STYLE = (None, 12, 'bold')
+OP_NAME_FONT = (None, 10, 'bold')
 BG_COLOR = '#1C1C1C'
 HEADER_TEXT_COLOR = "#FFFF00"
 SIDE_LABEL_COLOR = '#FFFF00'
@@ -147,9 +164,140 @@ ATTACKER_OP_COLOR = '#FF0000'
 DEFENDER_OP_COLOR = '#00BFFF'
 ACTIVE_TAB_COLOR = '#4A4A4A'
 INACTIVE_TAB_COLOR = '#2A2A2A'
-
-# --- Configuration Constants ---
-ROUND_COUNT = {"Ranked": 9, "Unranked": 9, "Quick": 5, "Just Generate": 1}
+SELECTED_OP_BG_COLOR = '#3A3A6A'
+BULK_BUTTON_COLOR = '#4A4A4A'
+FAVOURED_OP_COLOR = '#7CFC00'
+DEEMPHASISED_OP_COLOR = '#FFA500'
+
+# --- Main Window Layout Constants ---
+# Used both by the pack/grid calls and by fix_window_size, which computes the (fixed) window size from them.
+CONTAINER_PAD = 10 # padx/pady of main_container
+DISPLAY_FRAME_PADY = 5 # Around the rounds and backups frames
+BUTTON_FRAME_PADY = (10, 5)
+STATUS_LABEL_PADY = (0, 5)
+HEADER_LABEL_PADY = 5 # "Round N" / "Back N" labels
+SIDE_LABEL_PADX = 10 # "Attacker" / "Defender" labels
+CORNER_PADX = 5 # Empty top-left grid cell
+OP_CELL_PADY = 2 # Around each operator cell in the grid
+WINDOW_MARGIN = 20 # Extra room added to the container's size for the window geometry
+
+# --- Weight Constants ---
+# Right-clicking an operator in the disable window cycles through these weights.
+WEIGHT_STEPS = [1.0, 2.0, 0.5]
+
+# --- Recency Constants ---
+# How "Avoid recent ops" treats operators from the last few lineups ("exclude" or "downweight").
+RECENCY_POLICY = "exclude"
+
+# --- Lineup Renderer Constants ---
+# "widgets" shows each lineup in a grid of pooled Labels, "canvas" draws it on a single Canvas (LineupCanvas).
+LINEUP_RENDERER = "widgets"
+# The disable window is built hidden this long after startup (once the UI is idle), so opening it is instant.
+PREWARM_DELAY_MS = 500
+MAIN_ICON_SIZE = 48
+DISABLE_ICON_SIZE = 64
+# Upper bound on decoded icon memory; the full roster at every size and state needs about 3.2 MB.
+IMAGE_CACHE_BUDGET = 16 * 1024 * 1024
+CANVAS_CELL_PAD = 8 # Horizontal space around each operator cell
+CANVAS_ROW_PAD = 4 # Vertical space around each operator row
+CANVAS_HEADER_PAD = 5 # Vertical space around the round headers
+CANVAS_SIDE_PAD = 10 # Horizontal space around the Attacker/Defender labels
+
+
+class LineupCanvas:
+    """Draws a rounds or backups grid on one Canvas. Items are created once and their contents swapped in place."""
+    def __init__(self, parent, title_prefix, operators):
+        self.canvas = Canvas(parent, bg=BG_COLOR, highlightthickness=0, borderwidth=0, height=0)
+        self.canvas.pack(expand=True, fill='x')
+        self.header_font = tkfont.Font(font=FONT_STYLE)
+        self.name_font = tkfont.Font(font=OP_NAME_FONT)
+        self.title_prefix = title_prefix
+        max_rounds = max(ROUND_COUNT.values())
+        self.rounds = 0
+        self.shown = {"attackers": [None] * max_rounds, "defenders": [None] * max_rounds}
+        self.photos = {"attackers": [None] * max_rounds, "defenders": [None] * max_rounds}
+
+        self.headers = [self.canvas.create_text(0, 0, text=f"{title_prefix} {i+1}", font=FONT_STYLE, fill=HEADER_TEXT_COLOR,
+                                                anchor='center', state='hidden') for i in range(max_rounds)]
+        self.side_labels, self.icons, self.names = {}, {}, {}
+        for side, text, color in (("attackers", "Attacker", ATTACKER_OP_COLOR), ("defenders", "Defender", DEFENDER_OP_COLOR)):
+            self.side_labels[side] = self.canvas.create_text(0, 0, text=text, font=FONT_STYLE, fill=SIDE_LABEL_COLOR, anchor='w', state='hidden')
+            self.icons[side] = [self.canvas.create_image(0, 0, anchor='n', state='hidden') for _ in range(max_rounds)]
+            self.names[side] = [self.canvas.create_text(0, 0, text="", font=OP_NAME_FONT, fill=color, anchor='n', state='hidden')
+                                for _ in range(max_rounds)]
+        self.set_roster(operators)
+        self.canvas.bind('<Configure>', lambda e: self._layout())
+
+    @staticmethod
+    def measure(operators, title_prefix, header_font, name_font):
+        """Returns (cell_width, side_width, header_height, row_height) for a roster, from font metrics alone."""
+        widest = max([name_font.measure(op) for op in operators] + [MAIN_ICON_SIZE,
+                     header_font.measure(f"{title_prefix} {max(ROUND_COUNT.values())}")])
+        return (widest + 2 * CANVAS_CELL_PAD,
+                max(header_font.measure(text) for text in ("Attacker", "Defender")) + 2 * CANVAS_SIDE_PAD,
+                header_font.metrics('linespace') + 2 * CANVAS_HEADER_PAD,
+                MAIN_ICON_SIZE + name_font.metrics('linespace') + 2 * CANVAS_ROW_PAD)
+
+    def set_roster(self, operators):
+        """Sizes the cells so the longest operator name fits."""
+        self.cell_width, self.side_width, self.header_height, self.row_height = self.measure(
+            operators, self.title_prefix, self.header_font, self.name_font)
+        self.canvas.config(width=self.side_width + max(ROUND_COUNT.values()) * self.cell_width)
+        self.invalidate()
+        self._layout()
+
+    def invalidate(self):
+        """Forces every cell to be redrawn on the next show (e.g. after the image cache is cleared)."""
+        for ops in self.shown.values(): ops[:] = [None] * len(ops)
+
+    def _layout(self):
+        """Spreads the visible rounds across the canvas width, like the weighted grid columns of the widget renderer."""
+        if not self.rounds: return
+        width = self.canvas.winfo_width()
+        if width <= 1: width = int(self.canvas.cget('width'))
+        column_width = (width - self.side_width) / self.rounds
+        for i in range(self.rounds):
+            x = self.side_width + (i + 0.5) * column_width
+            self.canvas.coords(self.headers[i], x, self.header_height / 2)
+            for row, side in enumerate(("attackers", "defenders")):
+                top = self.header_height + row * self.row_height + CANVAS_ROW_PAD
+                self.canvas.coords(self.icons[side][i], x, top)
+                self.canvas.coords(self.names[side][i], x, top + MAIN_ICON_SIZE)
+        for row, side in enumerate(("attackers", "defenders")):
+            self.canvas.coords(self.side_labels[side], CANVAS_SIDE_PAD, self.header_height + (row + 0.5) * self.row_height)
+
+    def _fill_icon(self, side, i, op, photo):
+        if self.shown[side][i] == op: self._set_icon(side, i, photo)
+
+    def _set_icon(self, side, i, photo):
+        # The canvas only holds the image name, so keep a reference in case the image cache evicts it.
+        self.photos[side][i] = photo
+        self.canvas.itemconfig(self.icons[side][i], image=photo)
+
+    def show(self, data, load_image):
+        """Displays a lineup, only touching the items whose operator changed.
+
+        load_image(op, on_ready) returns an icon now and may call on_ready(photo) later with the finished one.
+        """
+        rounds = len(data["attackers"])
+        if rounds != self.rounds:
+            for i, header in enumerate(self.headers):
+                state = 'normal' if i < rounds else 'hidden'
+                self.canvas.itemconfig(header, state=state)
+                for side in ("attackers", "defenders"):
+                    self.canvas.itemconfig(self.icons[side][i], state=state)
+                    self.canvas.itemconfig(self.names[side][i], state=state)
+            for label in self.side_labels.values(): self.canvas.itemconfig(label, state='normal' if rounds else 'hidden')
+            self.canvas.config(height=self.header_height + 2 * self.row_height if rounds else 0)
+            self.rounds = rounds
+            self._layout()
+        for side, ops in data.items():
+            for i, op in enumerate(ops):
+                if self.shown[side][i] == op: continue
+                on_ready = lambda photo, side=side, i=i, op=op: self._fill_icon(side, i, op, photo)
+                self._set_icon(side, i, load_image(op, on_ready))
+                self.canvas.itemconfig(self.names[side][i], text=op)
+                self.shown[side][i] = op
 
 
 class R6OperatorGenerator:
@@ -161,51 +309,70 @@ class R6OperatorGenerator:
         self.win.withdraw()
 
         self.last_mode = None
+        self.last_record = None # Seed + roster version of the shown lineup, so it can be regenerated
+        self.prefetch_pending = False # An idle-time prefetch of the next lineup is already scheduled
         self.generated_rounds = {"attackers": [], "defenders": []}
         self.generated_backups = {"attackers": [], "defenders": []}
         
-        self.disabled_operators = set()
         self.operator_widgets = {} 
-        self.operator_images_color = {}
-        self.operator_images_grey = {}
-        self.main_display_images = {}
+        self.image_cache = ImageCache(IMAGE_CACHE_BUDGET) # Every operator icon, keyed by (op, size, greyscale)
+        self.icon_index = IconIndex(IMAGE_DIR) # Operator name -> icon file, from one scan of IMAGE_DIR
+        self.icon_atlas = IconAtlas(IMAGE_DIR) # Empty (every icon falls back to its PNG) until icon_atlas.py has been run
+        self.thumbnail_cache = ThumbnailCache(THUMBNAIL_CACHE_DIR)
+        self.icon_loader = BackgroundIconLoader(self.win, self.thumbnail_cache)
+        self.blank_images = {}
+        self.display_cells = {} # parent frame -> persistent round/backup grid reused across lineups
+        self.lineup_canvases = {} # parent frame -> LineupCanvas, when LINEUP_RENDERER is "canvas"
+        self.window_size_cache = {} # (roster, renderer, fonts) -> window size computed by fix_window_size
         self.disable_window = None 
         self.op_grid_frame = None
+        self.op_tab_frames = {} # tab -> its prebuilt operator grid inside op_grid_frame
+        self.op_widget_lookup = {} # Tk widget path -> operator name, for hit-testing drags
+        self.selected_ops = set() # Operators picked by drag or Ctrl+click for "Enable Only Selected"
+        self.drag_anchor = None # Operator the current left-button press started on
+        self.drag_moved = False
+        self.dirty_op_visuals = set() # Operators waiting for the next coalesced repaint
+        self.op_counter_dirty = False
+        self.op_visual_refresh_pending = False
         self.attacker_tab_button = None
         self.defender_tab_button = None
         self.active_disable_tab = 'attackers'
         
         # --- Variables for op counter and toggle ---
         self.allow_insufficient_ops = BooleanVar(value=False)
+        self.avoid_recent_ops = BooleanVar(value=False)
+        self.cycle_all_ops = BooleanVar(value=False)
         self.op_counter_frame = None # Frame to hold multiple labels
+        self.op_counter_labels = {} # tab -> (frame, [(round count, modes text, label)])
 
         self.attackers = []
         self.defenders = []
+        self.engine = LineupEngine([], [])
         self.load_operators(OPERATORS_FILE)
+        self.engine.load_history(HISTORY_FILE)
+        self.engine.load_bag(BAG_FILE)
 
-        self.main_container = Frame(self.win, background=BG_COLOR, padx=10, pady=10)
+        self.main_container = Frame(self.win, background=BG_COLOR, padx=CONTAINER_PAD, pady=CONTAINER_PAD)
         self.main_container.pack(expand=True, fill='both')
         
         self.output_frame = None
         self.button_frame = None
         self.backup_frame = None
         self.status_label = None 
+        self.timing_label = None
         self.update_button = None
         
         self.create_widgets()
         self.setup_hotkeys()
         self.fix_window_size()
         self.win.deiconify()
+        self.win.after(PREWARM_DELAY_MS, lambda: self.win.after_idle(self.prewarm_disable_window))
 
     def load_operators(self, filepath):
         """Loads operator lists from a JSON file and sets them as instance attributes."""
         try:
-            with open(filepath, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-                self.attackers = [op.upper() for op in data.get("ATTACKERS", [])] # Standardize to uppercase
-                self.defenders = [op.upper() for op in data.get("DEFENDERS", [])] # Standardize to uppercase
-                if not isinstance(self.attackers, list) or not isinstance(self.defenders, list):
-                    raise TypeError("ATTACKERS and DEFENDERS must be lists in the JSON file.")
+            self.attackers, self.defenders = load_roster(filepath)
+            self.engine.set_roster(self.attackers, self.defenders)
         except FileNotFoundError:
             messagebox.showerror("Fatal Error", f"'{os.path.basename(filepath)}' not found. Please create it or run the update checker.")
             sys.exit(1)
@@ -216,13 +383,15 @@ class R6OperatorGenerator:
     def create_widgets(self):
         """Creates and organizes all the UI elements in the window."""
         self.output_frame = Frame(self.main_container, background=BG_COLOR)
-        self.output_frame.pack(pady=5, expand=True, fill='x')
+        self.output_frame.pack(pady=DISPLAY_FRAME_PADY, expand=True, fill='x')
         self.button_frame = Frame(self.main_container, background=BG_COLOR)
-        self.button_frame.pack(pady=(10, 5))
+        self.button_frame.pack(pady=BUTTON_FRAME_PADY)
         self.status_label = Label(self.main_container, text="", bg=BG_COLOR, fg="orange", font=(None, 10, 'bold'))
-        self.status_label.pack(pady=(0, 5))
+        self.status_label.pack(pady=STATUS_LABEL_PADY)
+        self.timing_label = Label(self.main_container, text="", bg=BG_COLOR, fg='grey', font=(None, 8))
+        self.timing_label.pack()
         self.backup_frame = Frame(self.main_container, background=BG_COLOR)
-        self.backup_frame.pack(pady=5, expand=True, fill='x')
+        self.backup_frame.pack(pady=DISPLAY_FRAME_PADY, expand=True, fill='x')
         
         modes = ["Ranked", "Unranked", "Quick", "Just Generate", "Copy", "Disable Ops", "Check for Updates"]
         commands = {
@@ -241,135 +410,179 @@ class R6OperatorGenerator:
                 self.update_button = btn
 
     def fix_window_size(self):
-        """Calculates and fixes the window size based on content."""
+        """Calculates and fixes the window size from font metrics of the roster, without rendering a dummy lineup."""
         if not self.attackers or not self.defenders: return
-        self.win.update_idletasks()
-        original_rounds, original_backups = self.generated_rounds.copy(), self.generated_backups.copy()
-        
-        longest_attacker = max(self.attackers, key=len)
-        longest_defender = max(self.defenders, key=len)
-        max_rounds = ROUND_COUNT["Ranked"]
-
-        self.generated_rounds = {"attackers": [longest_attacker] * max_rounds, "defenders": [longest_defender] * max_rounds}
-        self.generated_backups = {"attackers": [longest_attacker] * max_rounds, "defenders": [longest_defender] * max_rounds}
-        
-        self.display_round_operators()
-        self.display_backup_operators()
-        self.win.update_idletasks()
-        
-        width = self.main_container.winfo_reqwidth()
-        height = self.main_container.winfo_reqheight()
-        self.win.geometry(f"{width + 20}x{height + 20}")
+        header_font, name_font = tkfont.Font(font=FONT_STYLE), tkfont.Font(font=OP_NAME_FONT)
+        key = (tuple(self.attackers), tuple(self.defenders), LINEUP_RENDERER,
+               tuple(sorted(header_font.actual().items())), tuple(sorted(name_font.actual().items())))
+        if key not in self.window_size_cache:
+            # The buttons and status lines never change size, so their requested sizes are used as-is.
+            self.win.update_idletasks()
+            rounds_width, rounds_height = self._lineup_grid_size("Round", header_font, name_font)
+            backups_width, backups_height = self._lineup_grid_size("Back", header_font, name_font)
+            width = max(rounds_width, backups_width, self.button_frame.winfo_reqwidth()) + 2 * CONTAINER_PAD
+            height = (rounds_height + 2 * DISPLAY_FRAME_PADY + self.button_frame.winfo_reqheight() + sum(BUTTON_FRAME_PADY)
+                      + self.status_label.winfo_reqheight() + sum(STATUS_LABEL_PADY) + self.timing_label.winfo_reqheight()
+                      + backups_height + 2 * DISPLAY_FRAME_PADY + 2 * CONTAINER_PAD)
+            self.window_size_cache[key] = (width, height)
+        width, height = self.window_size_cache[key]
+        self.win.geometry(f"{width + WINDOW_MARGIN}x{height + WINDOW_MARGIN}")
         self.win.resizable(False, False)
 
-        for widget in self.output_frame.winfo_children(): widget.destroy()
-        for widget in self.backup_frame.winfo_children(): widget.destroy()
-
-        self.generated_rounds, self.generated_backups = original_rounds, original_backups
-        self.display_round_operators()
-        self.display_backup_operators()
-
-    def generate_new_set(self, mode, force_display=True):
-        """Generates a new set of operators, respecting disabled list, and allowing reuse if needed."""
+    def _label_size(self, font, text="", padx=None, pady=None, image_size=None):
+        """Requested (width, height) of a default-styled Label, computed from font metrics."""
+        probe = self.status_label # Only set options that every display label shares are read from it
+        border = self.win.winfo_pixels(probe.cget('borderwidth')) + self.win.winfo_pixels(probe.cget('highlightthickness'))
+        padx = self.win.winfo_pixels(probe.cget('padx')) if padx is None else padx
+        pady = self.win.winfo_pixels(probe.cget('pady')) if pady is None else pady
+        if image_size: width, height = image_size
+        else: width, height = font.measure(text), font.metrics('linespace')
+        return width + 2 * (padx + border), height + 2 * (pady + border)
+
+    def _lineup_grid_size(self, title_prefix, header_font, name_font):
+        """Size of a rounds or backups display filled for the largest mode with the widest operator names."""
+        max_rounds = max(ROUND_COUNT.values())
+        operators = self.attackers + self.defenders
+        if LINEUP_RENDERER == "canvas":
+            cell_width, side_width, header_height, row_height = LineupCanvas.measure(operators, title_prefix, header_font, name_font)
+            return side_width + max_rounds * cell_width, header_height + 2 * row_height
+        widest = max(operators, key=name_font.measure)
+        corner_width, corner_height = self._label_size(tkfont.nametofont('TkDefaultFont'))
+        side_width = max(self._label_size(header_font, text, padx=SIDE_LABEL_PADX)[0] for text in ("Attacker", "Defender"))
+        header_width, header_height = self._label_size(header_font, f"{title_prefix} {max_rounds}", pady=HEADER_LABEL_PADY)
+        icon_width, icon_height = self._label_size(None, image_size=(MAIN_ICON_SIZE, MAIN_ICON_SIZE))
+        name_width, name_height = self._label_size(name_font, widest)
+        column_width = max(header_width, icon_width, name_width)
+        return (max(corner_width + 2 * CORNER_PADX, side_width) + max_rounds * column_width,
+                max(corner_height, header_height) + 2 * (icon_height + name_height + 2 * OP_CELL_PADY))
+
+    def sync_engine_options(self):
+        """Copies the disable window's toggles onto the engine."""
+        self.engine.allow_insufficient = self.allow_insufficient_ops.get()
+        self.engine.recency_policy = RECENCY_POLICY if self.avoid_recent_ops.get() else None
+        self.engine.coverage_mode = self.cycle_all_ops.get()
+
+    def generate_new_set(self, mode, force_display=True, started=None):
+        """Generates a new set of operators, respecting disabled list, and allowing reuse if needed.
+
+        Uses the lineup prefetched at idle time when nothing has changed since; started is when the
+        request was made (e.g. the hotkey press) for the timing readout.
+        """
+        if started is None: started = time.perf_counter()
         self.status_label.config(text="")
         self.last_mode = mode
-        round_count = ROUND_COUNT.get(mode, 0)
+        self.sync_engine_options()
 
-        enabled_attackers = [op for op in self.attackers if op not in self.disabled_operators]
-        enabled_defenders = [op for op in self.defenders if op not in self.disabled_operators]
+        try:
+            _, self.generated_rounds, self.generated_backups = self.engine.generate(mode)
+            self.last_record = self.engine.lineup_record(mode)
+            self.remember_lineup(self.generated_rounds)
+            if self.engine.coverage_mode:
+                try: self.engine.save_bag(BAG_FILE)
+                except OSError: pass
+        except LineupError as e:
+            self.status_label.config(text=str(e))
+            self.generated_rounds, self.generated_backups = empty_lineup(), empty_lineup()
+            self.last_record = None
 
-        if not enabled_attackers or not enabled_defenders:
-            self.status_label.config(text="Cannot generate with zero enabled attackers or defenders.")
-            self.generated_rounds, self.generated_backups = {"attackers": [], "defenders": []}, {"attackers": [], "defenders": []}
-        else:
-            sufficient_attackers = len(enabled_attackers) >= round_count
-            sufficient_defenders = len(enabled_defenders) >= round_count
-
-            if not self.allow_insufficient_ops.get() and (not sufficient_attackers or not sufficient_defenders):
-                msg = f"Not enough enabled operators for mode '{mode}'!"
-                self.status_label.config(text=msg)
-                self.generated_rounds, self.generated_backups = {"attackers": [], "defenders": []}, {"attackers": [], "defenders": []}
-            else:
-                # Generate main list of operators
-                attacker_sample_func = random.sample if sufficient_attackers else random.choices
-                defender_sample_func = random.sample if sufficient_defenders else random.choices
-
-                self.generated_rounds["attackers"] = attacker_sample_func(enabled_attackers, k=round_count)
-                self.generated_rounds["defenders"] = defender_sample_func(enabled_defenders, k=round_count)
-                
-                # Generate backup list, prioritizing unique operators
-                if mode != "Just Generate":
-                    # Attacker Backups
-                    main_attackers_set = set(self.generated_rounds["attackers"])
-                    available_attackers_for_backup = [op for op in enabled_attackers if op not in main_attackers_set]
-                    
-                    backup_attackers = []
-                    if len(available_attackers_for_backup) >= round_count:
-                        backup_attackers = random.sample(available_attackers_for_backup, k=round_count)
-                    else:
-                        backup_attackers.extend(available_attackers_for_backup)
-                        needed = round_count - len(backup_attackers)
-                        borrowed = random.choices(self.generated_rounds["attackers"], k=needed)
-                        backup_attackers.extend(borrowed)
-                        random.shuffle(backup_attackers)
-                    self.generated_backups["attackers"] = backup_attackers
-
-                    # Defender Backups
-                    main_defenders_set = set(self.generated_rounds["defenders"])
-                    available_defenders_for_backup = [op for op in enabled_defenders if op not in main_defenders_set]
-
-                    backup_defenders = []
-                    if len(available_defenders_for_backup) >= round_count:
-                        backup_defenders = random.sample(available_defenders_for_backup, k=round_count)
-                    else:
-                        backup_defenders.extend(available_defenders_for_backup)
-                        needed = round_count - len(backup_defenders)
-                        borrowed = random.choices(self.generated_rounds["defenders"], k=needed)
-                        backup_defenders.extend(borrowed)
-                        random.shuffle(backup_defenders)
-                    self.generated_backups["defenders"] = backup_defenders
-                else:
-                    self.generated_backups = {"attackers": [], "defenders": []}
-        
         if force_display:
             self.display_round_operators()
             self.display_backup_operators()
-
-    def _load_image(self, op_name, size, cache, greyscale=False):
-        """Internal helper to load, resize, and cache an image."""
-        cache_key = (op_name, greyscale)
-        if cache_key in cache: return cache[cache_key]
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            source = "prefetched" if self.engine.last_from_prefetch else "generated"
+            self.timing_label.config(text=f"Lineup ready in {elapsed_ms:.1f} ms ({source})")
+        self.schedule_prefetch()
+
+    def schedule_prefetch(self):
+        """Refills the pre-generated next lineup for last_mode once the UI is idle (coalesced)."""
+        if self.prefetch_pending or not self.last_mode: return
+        self.prefetch_pending = True
+        self.win.after_idle(self._prefetch_next)
+
+    def _prefetch_next(self):
+        self.prefetch_pending = False
+        self.sync_engine_options()
+        self.engine.prefetch(self.last_mode)
+
+    def remember_lineup(self, rounds):
+        """Adds a lineup to the recency history and saves it so it survives restarts."""
+        self.engine.remember(rounds)
+        try: self.engine.save_history(HISTORY_FILE)
+        except OSError: pass
+
+    def _load_image(self, op_name, size, greyscale=False, on_ready=None):
+        """Internal helper to load, resize, and cache an image.
+
+        With on_ready, an icon that needs decoding is loaded in the background: a blank image of the same size
+        is returned straight away and on_ready(photo) is called on the Tk thread once the real one is cached.
+        """
+        cache_key = (op_name, size, greyscale)
+        photo = self.image_cache.get(cache_key)
+        if photo is not None: return photo
         
-        try:
-            image_path = os.path.join(IMAGE_DIR, f"{op_name} icon.png")
-            with Image.open(image_path) as img:
-                img = img.resize(size, Image.Resampling.LANCZOS)
-                if greyscale: img = ImageOps.grayscale(img).convert('RGBA')
-                photo = ImageTk.PhotoImage(img)
-                cache[cache_key] = photo
-                return photo
-        except FileNotFoundError:
-            placeholder = Image.new('RGB', size, 'black')
-            if greyscale: placeholder = ImageOps.grayscale(placeholder)
-            photo = ImageTk.PhotoImage(placeholder)
-            cache[cache_key] = photo
+        # Prebuilt atlas first (no decode at all), then the on-disk thumbnail cache, which only resamples on a miss.
+        image_path = self.icon_index.resolve(op_name)
+        photo = self.icon_atlas.slice(op_name, size[0], greyscale, image_path)
+        if photo is None and image_path is None: photo = self._placeholder_image(size, greyscale)
+        if photo is not None:
+            self.image_cache.put(cache_key, photo)
             return photo
-
-    def load_disable_window_images(self, op_name):
-        color_img = self._load_image(op_name, (64, 64), self.operator_images_color, greyscale=False)
-        grey_img = self._load_image(op_name, (64, 64), self.operator_images_grey, greyscale=True)
+        if on_ready is not None:
+            version = self.image_cache.version(op_name)
+            def finish(photo):
+                if version != self.image_cache.version(op_name): return # Invalidated while it was decoding
+                if cache_key in self.image_cache: photo = self.image_cache.get(cache_key)
+                else:
+                    photo = photo or self._placeholder_image(size, greyscale)
+                    self.image_cache.put(cache_key, photo)
+                on_ready(photo)
+            self.icon_loader.request(image_path, size[0], greyscale, finish)
+            return self._blank_image(size)
+        try:
+            thumbnail_path = self.thumbnail_cache.thumbnail(image_path, size[0], greyscale)
+            if thumbnail_path: photo = PhotoImage(file=thumbnail_path)
+            else: photo = ImageTk.PhotoImage(render_icon(image_path, size, greyscale)) # Cache folder not writable
+        except FileNotFoundError: # Deleted since the folder was indexed
+            photo = self._placeholder_image(size, greyscale)
+        self.image_cache.put(cache_key, photo)
+        return photo
+
+    def _placeholder_image(self, size, greyscale=False):
+        """Black square shown for operators without an icon file."""
+        placeholder = Image.new('RGB', size, 'black')
+        if greyscale: placeholder = ImageOps.grayscale(placeholder)
+        return ImageTk.PhotoImage(placeholder)
+
+    def _blank_image(self, size):
+        """Transparent stand-in that keeps the layout stable while an icon loads in the background."""
+        if size not in self.blank_images: self.blank_images[size] = PhotoImage(width=size[0], height=size[1])
+        return self.blank_images[size]
+
+    def load_disable_window_images(self, op_name, on_ready=None):
+        color_img = self._load_image(op_name, (DISABLE_ICON_SIZE, DISABLE_ICON_SIZE), greyscale=False, on_ready=on_ready)
+        grey_img = self._load_image(op_name, (DISABLE_ICON_SIZE, DISABLE_ICON_SIZE), greyscale=True, on_ready=on_ready)
         return color_img, grey_img
 
-    def load_main_display_image(self, op_name):
-        return self._load_image(op_name, (48, 48), self.main_display_images, greyscale=False)
+    def load_main_display_image(self, op_name, on_ready=None):
+        return self._load_image(op_name, (MAIN_ICON_SIZE, MAIN_ICON_SIZE), greyscale=False, on_ready=on_ready)
 
     def open_disable_window(self):
-        """Opens a new Toplevel window to manage disabled operators."""
-        if self.disable_window and self.disable_window.winfo_exists():
-            self.disable_window.lift()
-            return
+        """Shows the window to manage disabled operators, building it first if it was not prewarmed."""
+        if not self.disable_window or not self.disable_window.winfo_exists(): self.build_disable_window()
+        self.update_op_counter()
+        self.disable_window.deiconify()
+        self.disable_window.lift()
+
+    def prewarm_disable_window(self):
+        """Builds the disable window hidden while the app is idle, so the first open is only a deiconify."""
+        if not self.disable_window or not self.disable_window.winfo_exists(): self.build_disable_window()
 
+    def build_disable_window(self):
+        """Creates the (withdrawn) Toplevel to manage disabled operators, with every icon already loaded."""
         self.disable_window = Toplevel(self.win)
+        self.disable_window.withdraw()
+        # Closing only hides the window so the next open can reuse it.
+        self.disable_window.protocol("WM_DELETE_WINDOW", self.disable_window.withdraw)
         self.disable_window.title("Disable Operators")
         self.disable_window.configure(bg=BG_COLOR)
         self.disable_window.attributes('-topmost', True)
@@ -389,8 +602,18 @@ class R6OperatorGenerator:
         bottom_frame = Frame(self.disable_window, bg=BG_COLOR)
         bottom_frame.pack(side='bottom', fill='x', padx=10, pady=(0, 10))
 
+        # --- Bulk actions (drag across the grid or Ctrl+click to select) ---
+        bulk_frame = Frame(self.disable_window, bg=BG_COLOR)
+        bulk_frame.pack(side='bottom', fill='x', padx=10, pady=(0, 5))
+        bulk_actions = [("Disable All", self.disable_all_for_current_view), ("Invert", self.invert_disables_for_current_view),
+                        ("Enable Only Selected", self.enable_only_selection)]
+        for text, command in bulk_actions:
+            Button(bulk_frame, text=text, command=command, bg=BULK_BUTTON_COLOR, fg='white', font=(None, 8, 'bold'),
+                   relief='raised', padx=5, pady=2).pack(side='left', padx=(0, 10))
+
         self.op_counter_frame = Frame(bottom_frame, bg=BG_COLOR)
         self.op_counter_frame.pack(side='left')
+        self.build_op_counters()
 
         # --- Frame for right-side controls ---
         right_controls_frame = Frame(bottom_frame, bg=BG_COLOR)
@@ -405,9 +628,23 @@ class R6OperatorGenerator:
                                     activeforeground='white', font=(None, 9), relief='flat', highlightthickness=0, bd=0)
         toggle_button.pack(side='left')
 
-        # --- Logic to prevent resizing ---
-        longest_list = self.attackers if len(self.attackers) >= len(self.defenders) else self.defenders
-        self.populate_operator_grid(longest_list)
+        recent_button = Checkbutton(right_controls_frame, text="Avoid recent ops", variable=self.avoid_recent_ops,
+                                    bg=BG_COLOR, fg='white', selectcolor=BG_COLOR, activebackground=BG_COLOR,
+                                    activeforeground='white', font=(None, 9), relief='flat', highlightthickness=0, bd=0)
+        recent_button.pack(side='left', padx=(10, 0))
+
+        cycle_button = Checkbutton(right_controls_frame, text="Cycle all ops", variable=self.cycle_all_ops,
+                                   bg=BG_COLOR, fg='white', selectcolor=BG_COLOR, activebackground=BG_COLOR,
+                                   activeforeground='white', font=(None, 9), relief='flat', highlightthickness=0, bd=0)
+        cycle_button.pack(side='left', padx=(10, 0))
+
+        # --- Build both tab grids once; measuring with both shown sizes the window for the longer one ---
+        self.operator_widgets = {}
+        self.op_widget_lookup = {}
+        self.selected_ops = set()
+        self.op_tab_frames = {'attackers': self.populate_operator_grid(self.attackers),
+                              'defenders': self.populate_operator_grid(self.defenders)}
+        for tab_frame in self.op_tab_frames.values(): tab_frame.grid(row=0, column=0, sticky='nw')
         self.disable_window.update_idletasks()
         width = self.disable_window.winfo_reqwidth()
         height = self.disable_window.winfo_reqheight()
@@ -417,115 +654,250 @@ class R6OperatorGenerator:
         self.switch_disable_view(self.active_disable_tab)
 
     def switch_disable_view(self, op_type):
-        """Clears and repopulates the grid for the selected operator type."""
+        """Shows the prebuilt grid for the selected operator type and hides the other one."""
         self.active_disable_tab = op_type
-        for widget in self.op_grid_frame.winfo_children(): widget.destroy()
+        self.set_selection(set())
+        for tab, tab_frame in self.op_tab_frames.items():
+            if tab == op_type: tab_frame.grid()
+            else: tab_frame.grid_remove()
 
         if op_type == 'attackers':
             self.attacker_tab_button.config(bg=ACTIVE_TAB_COLOR, fg=ATTACKER_OP_COLOR)
             self.defender_tab_button.config(bg=INACTIVE_TAB_COLOR, fg=DEFENDER_OP_COLOR)
-            self.populate_operator_grid(self.attackers)
         else: # defenders
             self.attacker_tab_button.config(bg=INACTIVE_TAB_COLOR, fg=ATTACKER_OP_COLOR)
             self.defender_tab_button.config(bg=ACTIVE_TAB_COLOR, fg=DEFENDER_OP_COLOR)
-            self.populate_operator_grid(self.defenders)
-            
+
         self.update_op_counter() # Update counter for the new view
 
     def populate_operator_grid(self, operators):
-        """Fills the grid with operators, preserving the original JSON order."""
+        """Builds a tab's grid of operators in a new frame, preserving the original JSON order."""
         cols = 10
+        grid_frame = Frame(self.op_grid_frame, bg=BG_COLOR)
         for i, op_name in enumerate(operators):
             row, col = divmod(i, cols)
-            op_frame = Frame(self.op_grid_frame, bg=BG_COLOR)
+            op_frame = Frame(grid_frame, bg=BG_COLOR)
             op_frame.grid(row=row, column=col, padx=5, pady=5)
             icon_label = Label(op_frame, bg=BG_COLOR); icon_label.pack()
             name_label = Label(op_frame, text=op_name, bg=BG_COLOR, fg='white', font=(None, 9)); name_label.pack()
-            self.operator_widgets[op_name] = {'icon': icon_label, 'name': name_label}
+            self.operator_widgets[op_name] = {'frame': op_frame, 'icon': icon_label, 'name': name_label, 'cell': (row, col)}
             self.update_op_widget_visual(op_name)
             for widget in [op_frame, icon_label, name_label]:
-                widget.bind("<Button-1>", lambda e, op=op_name: self.toggle_operator_disabled(op))
+                self.op_widget_lookup[str(widget)] = op_name
+                widget.bind("<Button-1>", lambda e, op=op_name: self.on_op_press(op))
+                widget.bind("<B1-Motion>", self.on_op_drag)
+                widget.bind("<ButtonRelease-1>", lambda e, op=op_name: self.on_op_release(op))
+                widget.bind("<Control-Button-1>", lambda e, op=op_name: self.on_op_ctrl_click(op))
+                widget.bind("<Button-3>", lambda e, op=op_name: self.cycle_operator_weight(op))
+        return grid_frame
 
     def reset_disables_for_current_view(self):
         """Resets the disabled operators for the currently active tab."""
-        if not self.disable_window or not self.disable_window.winfo_exists():
-            return
-            
-        ops_to_reset = self.attackers if self.active_disable_tab == 'attackers' else self.defenders
-        
-        # Go through the list of ops for the current view and remove them from the disabled set.
-        for op_name in ops_to_reset:
-            if op_name in self.disabled_operators:
-                self.disabled_operators.remove(op_name)
-        
-        # Refresh the visuals for all operators on the current grid.
-        for op_name in ops_to_reset:
-            self.update_op_widget_visual(op_name)
-            
-        # Update the counter to reflect the changes.
-        self.update_op_counter()
+        self.apply_bulk_disable(0)
+
+    # --- Bulk actions and selection ---
+    def apply_bulk_disable(self, disabled_mask):
+        """Sets the active tab's disabled operators in one engine batch, then repaints only the ones that changed."""
+        if not self.disable_window or not self.disable_window.winfo_exists(): return
+        changed = self.engine.set_side_disabled(self.active_disable_tab, disabled_mask)
+        if not changed: return
+        self.queue_op_visuals(self.engine.operator_index.names_in(changed), counter=True)
+        self.schedule_prefetch()
+
+    def disable_all_for_current_view(self):
+        self.apply_bulk_disable(self.engine.roster_mask[self.active_disable_tab])
+
+    def invert_disables_for_current_view(self):
+        self.apply_bulk_disable(self.engine.roster_mask[self.active_disable_tab] & ~self.engine.disabled_mask)
+
+    def enable_only_selection(self):
+        """Disables every operator on the active tab except the selected ones."""
+        if not self.selected_ops: return
+        self.apply_bulk_disable(self.engine.roster_mask[self.active_disable_tab] & ~self.engine.operator_index.mask(self.selected_ops))
+        self.set_selection(set())
+
+    def set_selection(self, ops):
+        changed = self.selected_ops ^ ops
+        self.selected_ops = set(ops)
+        if changed: self.queue_op_visuals(changed)
+
+    def ops_between(self, first_op, last_op):
+        """Operators of the active tab inside the grid rectangle spanned by two operators."""
+        (row_a, col_a), (row_b, col_b) = self.operator_widgets[first_op]['cell'], self.operator_widgets[last_op]['cell']
+        rows, cols = range(min(row_a, row_b), max(row_a, row_b) + 1), range(min(col_a, col_b), max(col_a, col_b) + 1)
+        operators = self.attackers if self.active_disable_tab == 'attackers' else self.defenders
+        return {op for op in operators if op in self.operator_widgets
+                and self.operator_widgets[op]['cell'][0] in rows and self.operator_widgets[op]['cell'][1] in cols}
+
+    def on_op_press(self, op_name):
+        self.drag_anchor, self.drag_moved = op_name, False
+
+    def on_op_drag(self, event):
+        """Selects the rectangle from the pressed operator to the one under the pointer."""
+        if not self.drag_anchor: return
+        op_name = self.op_widget_lookup.get(str(self.disable_window.winfo_containing(event.x_root, event.y_root)))
+        if op_name is None or (op_name == self.drag_anchor and not self.drag_moved): return
+        self.drag_moved = True
+        self.set_selection(self.ops_between(self.drag_anchor, op_name))
+
+    def on_op_release(self, op_name):
+        """A press and release without dragging is a plain click, which toggles the operator."""
+        if self.drag_anchor and not self.drag_moved:
+            self.set_selection(set())
+            self.toggle_operator_disabled(op_name)
+        self.drag_anchor = None
+
+    def on_op_ctrl_click(self, op_name):
+        self.drag_anchor = None
+        self.set_selection(self.selected_ops ^ {op_name})
+
+    def queue_op_visuals(self, ops, counter=False):
+        """Marks operators (and optionally the counter) for repaint; everything queued is applied in one idle pass."""
+        self.dirty_op_visuals.update(ops)
+        self.op_counter_dirty |= counter
+        if self.op_visual_refresh_pending: return
+        self.op_visual_refresh_pending = True
+        self.win.after_idle(self.flush_op_visuals)
+
+    def flush_op_visuals(self):
+        self.op_visual_refresh_pending = False
+        dirty, self.dirty_op_visuals = self.dirty_op_visuals, set()
+        if not self.disable_window or not self.disable_window.winfo_exists(): return
+        for op_name in dirty: self.update_op_widget_visual(op_name)
+        if self.op_counter_dirty:
+            self.op_counter_dirty = False
+            self.update_op_counter()
 
     def toggle_operator_disabled(self, op_name):
-        if op_name in self.disabled_operators: self.disabled_operators.remove(op_name)
-        else: self.disabled_operators.add(op_name)
+        self.engine.toggle_disabled(op_name)
         self.update_op_widget_visual(op_name)
         self.update_op_counter()
+        self.schedule_prefetch()
+
+    def cycle_operator_weight(self, op_name):
+        """Moves an operator to the next weight in WEIGHT_STEPS (normal -> favoured -> de-emphasised)."""
+        weight = self.engine.weight(op_name)
+        next_step = (WEIGHT_STEPS.index(weight) + 1) % len(WEIGHT_STEPS) if weight in WEIGHT_STEPS else 0
+        self.engine.set_weight(op_name, WEIGHT_STEPS[next_step])
+        self.update_op_widget_visual(op_name)
+        self.schedule_prefetch()
 
     def update_op_widget_visual(self, op_name):
         if op_name not in self.operator_widgets: return
         widget_set = self.operator_widgets[op_name]
-        is_disabled = op_name in self.disabled_operators
-        color_img, grey_img = self.load_disable_window_images(op_name)
-        widget_set['icon'].config(image=grey_img if is_disabled else color_img)
-        widget_set['name'].config(fg='grey' if is_disabled else 'white')
+        is_disabled = self.engine.is_disabled(op_name)
+        color_img, grey_img = self.load_disable_window_images(op_name, on_ready=lambda photo: self.queue_op_visuals([op_name]))
+        weight = self.engine.weight(op_name)
+        if is_disabled: name_color = 'grey'
+        elif weight > 1.0: name_color = FAVOURED_OP_COLOR
+        elif weight < 1.0: name_color = DEEMPHASISED_OP_COLOR
+        else: name_color = 'white'
+        bg = SELECTED_OP_BG_COLOR if op_name in self.selected_ops else BG_COLOR
+        widget_set['name'].config(fg=name_color, bg=bg)
+        widget_set['icon'].image = grey_img if is_disabled else color_img # Own reference; the cache may evict it
+        widget_set['icon'].config(image=widget_set['icon'].image, bg=bg)
+        widget_set['frame'].config(bg=bg)
+
+    def build_op_counters(self):
+        """Creates each tab's counter labels once; update_op_counter then only changes their text and colour."""
+        grouped_reqs = {}
+        for mode in ("Quick", "Ranked", "Unranked"): grouped_reqs.setdefault(ROUND_COUNT[mode], []).append(mode)
+        self.op_counter_labels = {}
+        for tab, role in (('attackers', "Attackers"), ('defenders', "Defenders")):
+            tab_frame = Frame(self.op_counter_frame, bg=BG_COLOR)
+            Label(tab_frame, text=f"{role}:", bg=BG_COLOR, fg='white', font=(None, 9, 'bold')).pack(side='left', padx=(0, 5))
+            counters = []
+            for count, modes in sorted(grouped_reqs.items()):
+                label = Label(tab_frame, text="", bg=BG_COLOR, fg='white', font=(None, 9))
+                label.pack(side='left', padx=5)
+                counters.append((count, "/".join(modes), label))
+            self.op_counter_labels[tab] = (tab_frame, counters)
 
     def update_op_counter(self):
         """Updates the operator counter labels based on the active tab and colors them individually."""
-        if not self.op_counter_frame or not self.disable_window.winfo_exists(): return
-        
-        for widget in self.op_counter_frame.winfo_children(): widget.destroy()
-
-        if self.active_disable_tab == 'attackers':
-            enabled_count = len([op for op in self.attackers if op not in self.disabled_operators])
-            role = "Attackers"
-        else: # defenders
-            enabled_count = len([op for op in self.defenders if op not in self.disabled_operators])
-            role = "Defenders"
-
-        Label(self.op_counter_frame, text=f"{role}:", bg=BG_COLOR, fg='white', font=(None, 9, 'bold')).pack(side='left', padx=(0, 5))
-
-        reqs = {"Quick": ROUND_COUNT["Quick"], "Ranked": ROUND_COUNT["Ranked"], "Unranked": ROUND_COUNT["Unranked"]}
-        grouped_reqs = {}
-        for mode, count in reqs.items():
-            if count not in grouped_reqs: grouped_reqs[count] = []
-            grouped_reqs[count].append(mode)
-            
-        for count, modes in sorted(grouped_reqs.items()):
-            mode_str = "/".join(modes)
-            is_sufficient = enabled_count >= count
-            color = 'white' if is_sufficient else '#FF4C4C'
-            text = f"{mode_str}: {enabled_count}/{count}"
-            Label(self.op_counter_frame, text=text, bg=BG_COLOR, fg=color, font=(None, 9)).pack(side='left', padx=5)
+        if not self.op_counter_labels or not self.disable_window.winfo_exists(): return
+        for tab, (tab_frame, _) in self.op_counter_labels.items():
+            if tab != self.active_disable_tab: tab_frame.pack_forget()
+        tab_frame, counters = self.op_counter_labels[self.active_disable_tab]
+        if not tab_frame.winfo_manager(): tab_frame.pack(side='left')
+
+        enabled_count = self.engine.enabled_count(self.active_disable_tab)
+        for count, mode_str, label in counters:
+            color = 'white' if enabled_count >= count else '#FF4C4C'
+            label.config(text=f"{mode_str}: {enabled_count}/{count}", fg=color)
+
+    def _build_display_cells(self, parent_frame, title_prefix):
+        """Creates the persistent grid of header, side and operator cells, sized for the largest mode."""
+        max_rounds = max(ROUND_COUNT.values())
+        cells = {"rounds": None, "columns": 0}
+        cells["corner"] = Label(parent_frame, text="", bg=BG_COLOR)
+        cells["headers"] = [Label(parent_frame, text=f"{title_prefix} {i+1}", bg=BG_COLOR, font=FONT_STYLE, fg=HEADER_TEXT_COLOR, pady=HEADER_LABEL_PADY)
+                            for i in range(max_rounds)]
+        cells["sides"] = {}
+        for row, (side, text, color) in enumerate((("attackers", "Attacker", ATTACKER_OP_COLOR), ("defenders", "Defender", DEFENDER_OP_COLOR)), start=1):
+            side_label = Label(parent_frame, text=text, bg=BG_COLOR, font=FONT_STYLE, fg=SIDE_LABEL_COLOR, padx=SIDE_LABEL_PADX)
+            slots = []
+            for i in range(max_rounds):
+                op_frame = Frame(parent_frame, bg=BG_COLOR)
+                icon_label = Label(op_frame, bg=BG_COLOR); icon_label.pack()
+                name_label = Label(op_frame, text="", bg=BG_COLOR, font=OP_NAME_FONT, fg=color); name_label.pack()
+                slots.append({"frame": op_frame, "icon": icon_label, "name": name_label, "op": None, "row": row, "column": i+1})
+            cells["sides"][side] = {"label": side_label, "row": row, "slots": slots}
+        return cells
 
     def _display_operators(self, parent_frame, data, title_prefix):
-        for widget in parent_frame.winfo_children(): widget.destroy()
-        if not data["attackers"]: return
-        Label(parent_frame, text="", bg=BG_COLOR).grid(row=0, column=0, padx=5)
-        for i in range(len(data["attackers"])):
-            Label(parent_frame, text=f"{title_prefix} {i+1}", bg=BG_COLOR, font=FONT_STYLE, fg=HEADER_TEXT_COLOR, pady=5).grid(row=0, column=i+1)
-        Label(parent_frame, text="Attacker", bg=BG_COLOR, font=FONT_STYLE, fg=SIDE_LABEL_COLOR, padx=10).grid(row=1, column=0, sticky='w')
-        for i, op in enumerate(data["attackers"]):
-            op_frame = Frame(parent_frame, bg=BG_COLOR); op_frame.grid(row=1, column=i+1, pady=2)
-            icon = self.load_main_display_image(op)
-            Label(op_frame, image=icon, bg=BG_COLOR).pack()
-            Label(op_frame, text=op, bg=BG_COLOR, font=(None, 10, 'bold'), fg=ATTACKER_OP_COLOR).pack()
-        Label(parent_frame, text="Defender", bg=BG_COLOR, font=FONT_STYLE, fg=SIDE_LABEL_COLOR, padx=10).grid(row=2, column=0, sticky='w')
-        for i, op in enumerate(data["defenders"]):
-            op_frame = Frame(parent_frame, bg=BG_COLOR); op_frame.grid(row=2, column=i+1, pady=2)
-            icon = self.load_main_display_image(op)
-            Label(op_frame, image=icon, bg=BG_COLOR).pack()
-            Label(op_frame, text=op, bg=BG_COLOR, font=(None, 10, 'bold'), fg=DEFENDER_OP_COLOR).pack()
-        for i in range(len(data["attackers"]) + 1): parent_frame.grid_columnconfigure(i, weight=1)
+        """Shows a lineup in the frame's persistent cell grid, only reconfiguring cells whose operator changed."""
+        if LINEUP_RENDERER == "canvas":
+            renderer = self.lineup_canvases.get(parent_frame)
+            if renderer is None: renderer = self.lineup_canvases[parent_frame] = LineupCanvas(parent_frame, title_prefix, self.attackers + self.defenders)
+            renderer.show(data, self.load_main_display_image)
+            return
+        cells = self.display_cells.get(parent_frame)
+        if cells is None: cells = self.display_cells[parent_frame] = self._build_display_cells(parent_frame, title_prefix)
+        rounds = len(data["attackers"])
+
+        if rounds != cells["rounds"]:
+            # Only the visible layout changes here; the widgets themselves are kept.
+            shown = 0 if cells["rounds"] is None else cells["rounds"]
+            if rounds and not shown:
+                cells["corner"].grid(row=0, column=0, padx=CORNER_PADX)
+                for side in cells["sides"].values(): side["label"].grid(row=side["row"], column=0, sticky='w')
+            elif shown and not rounds:
+                cells["corner"].grid_remove()
+                for side in cells["sides"].values(): side["label"].grid_remove()
+            for i, header in enumerate(cells["headers"]):
+                if i < rounds: header.grid(row=0, column=i+1)
+                else: header.grid_remove()
+            for side in cells["sides"].values():
+                for i, slot in enumerate(side["slots"]):
+                    if i < rounds: slot["frame"].grid(row=slot["row"], column=slot["column"], pady=OP_CELL_PADY)
+                    else: slot["frame"].grid_remove()
+            columns = max(rounds + 1, cells["columns"])
+            for i in range(columns): parent_frame.grid_columnconfigure(i, weight=1 if rounds and i <= rounds else 0)
+            cells["rounds"], cells["columns"] = rounds, columns
+
+        for side, ops in data.items():
+            for slot, op in zip(cells["sides"][side]["slots"], ops):
+                if slot["op"] == op: continue
+                self._set_slot_icon(slot, self.load_main_display_image(op, on_ready=lambda photo, slot=slot, op=op: self._fill_slot_icon(slot, op, photo)))
+                slot["name"].config(text=op)
+                slot["op"] = op
+
+    def _fill_slot_icon(self, slot, op, photo):
+        # Only if the cell still shows the operator the icon was requested for.
+        if slot["op"] == op: self._set_slot_icon(slot, photo)
+
+    def _set_slot_icon(self, slot, photo):
+        # The label only holds the image name, so keep a reference in case the image cache evicts it.
+        slot["photo"] = photo
+        slot["icon"].config(image=photo)
+
+    def invalidate_display_cells(self):
+        """Forces every pooled cell to be redrawn on the next display (e.g. after the image cache is cleared)."""
+        for cells in self.display_cells.values():
+            for side in cells["sides"].values():
+                for slot in side["slots"]: slot["op"] = None
+        for renderer in self.lineup_canvases.values(): renderer.set_roster(self.attackers + self.defenders)
 
     def display_round_operators(self): self._display_operators(self.output_frame, self.generated_rounds, "Round")
     def display_backup_operators(self): self._display_operators(self.backup_frame, self.generated_backups, "Back")
@@ -540,6 +912,9 @@ class R6OperatorGenerator:
             attackers_str = ', '.join(self.generated_backups["attackers"])
             defenders_str = ', '.join(self.generated_backups["defenders"])
             text_parts.append(f"Backup\nA={attackers_str}\nD={defenders_str}")
+        if text_parts and self.last_record:
+            # The whole record (weights, recency and shuffle-bag state included) so replay_lineup can regenerate it exactly.
+            text_parts.append("Record=" + json.dumps(self.last_record, ensure_ascii=False, separators=(',', ':')))
         full_text = "\n\n".join(text_parts)
         if full_text:
             self.win.clipboard_append(full_text.strip())
@@ -553,7 +928,9 @@ class R6OperatorGenerator:
         except Exception: pass
 
     def reactivate_last_mode(self):
-        if self.last_mode: self.win.after(0, lambda: self.generate_new_set(self.last_mode))
+        # Runs on the keyboard hook thread; the press time is taken here so the readout includes the Tk hand-off.
+        started = time.perf_counter()
+        if self.last_mode: self.win.after(0, lambda: self.generate_new_set(self.last_mode, started=started))
     
     # --- Scraper Integration Methods ---
     
@@ -574,7 +951,7 @@ class R6OperatorGenerator:
 
     def _run_scraper_logic(self):
         """The core scraping logic, designed to run in a background thread."""
-        results = {'new_ops': [], 'new_images_count': 0, 'error': None}
+        results = {'new_ops': [], 'new_images_count': 0, 'updated_icons': [], 'error': None}
         try:
             setup_environment()
             driver = create_driver()
@@ -603,7 +980,9 @@ class R6OperatorGenerator:
             if all_missing_images:
                 unique_images = {img['url']: img for img in all_missing_images}.values()
                 results['new_images_count'] = len(unique_images)
-                for image_info in unique_images: download_image(session, image_info['url'], image_info['filepath'])
+                for image_info in unique_images:
+                    download_image(session, image_info['url'], image_info['filepath'])
+                    results['updated_icons'].append(image_info['filename'][:-len(" icon.png")])
             if new_operators_found: write_operator_lists(sorted(updated_attackers), sorted(updated_defenders))
         except Exception as e: results['error'] = f"An error occurred during scraping: {e}"
         self.win.after(0, self._on_scraper_complete, results)
@@ -628,18 +1007,25 @@ class R6OperatorGenerator:
         summary_message = "\n".join(message_parts)
         self.status_label.config(text="Update complete! " + " | ".join(message_parts))
         messagebox.showinfo("Update Complete", summary_message)
-        self.reload_data_and_refresh_ui()
+        self.reload_data_and_refresh_ui(results['updated_icons'])
 
-    def reload_data_and_refresh_ui(self):
-        """Reloads operator data from file and refreshes relevant UI parts."""
+    def reload_data_and_refresh_ui(self, updated_icons=None):
+        """Reloads operator data from file and refreshes relevant UI parts.
+
+        Only the cached images of updated_icons are dropped; without it the whole image cache is cleared.
+        """
         self.load_operators(OPERATORS_FILE)
-        self.operator_images_color.clear()
-        self.operator_images_grey.clear()
-        self.main_display_images.clear()
+        self.icon_index.refresh() # Only files added or removed since the last scan are looked at
+        if updated_icons is None: self.image_cache.clear()
+        else:
+            for op_name in updated_icons: self.image_cache.invalidate(op_name)
+        self.invalidate_display_cells()
         if self.disable_window and self.disable_window.winfo_exists():
-            # Re-open (or refresh) logic
+            # Rebuild for the new roster, showing it again only if it was open.
+            was_open = self.disable_window.state() != 'withdrawn'
             self.disable_window.destroy()
-            self.open_disable_window()
+            if was_open: self.open_disable_window()
+            else: self.prewarm_disable_window()
         if self.last_mode:
             self.generate_new_set(self.last_mode, force_display=True)
         self.fix_window_size()
@@ -647,6 +1033,7 @@ class R6OperatorGenerator:
     def run(self):
         """Starts the Tkinter main loop."""
         self.win.mainloop()
+        self.icon_loader.shutdown()
 
 # --- Main Execution ---
 if __name__ == "__main__":
@@ -0,0 +1,5 @@
+# The tools in all_in_one import each other as top-level modules, so put that folder on the path.
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,232 @@
+from collections import Counter
+import random
+import pytest
+
+import lineup_engine
+from lineup_engine import AliasTable, LineupEngine, LineupError, SQUAD_SIZE, SeedStream, decode_bulk, replay_lineup
+
+ATTACKERS = [f"A{i}" for i in range(20)]
+DEFENDERS = [f"D{i}" for i in range(20)]
+DISABLED = ["A3", "D7"]
+
+
+def make_engine(**kwargs):
+    return LineupEngine(ATTACKERS, DEFENDERS, disabled_operators=DISABLED, seed=1234, **kwargs)
+
+
+@pytest.mark.parametrize("mode, round_count", [("Ranked", 9), ("Quick", 5), ("Just Generate", 1)])
+def test_generate_batch_fills_every_lineup(mode, round_count):
+    engine = make_engine()
+    batch = engine.generate_batch(mode, 50)
+    assert len(batch) == 50
+    for _, rounds, backups in batch:
+        for side, roster in (("attackers", ATTACKERS), ("defenders", DEFENDERS)):
+            assert len(rounds[side]) == len(set(rounds[side])) == round_count
+            assert set(rounds[side] + backups[side]) <= set(roster) - set(DISABLED)
+            if mode != "Just Generate": assert not set(rounds[side]) & set(backups[side])
+            else: assert backups[side] == []
+
+
+def test_generate_rejects_too_small_pools():
+    engine = LineupEngine(ATTACKERS[:4], DEFENDERS)
+    with pytest.raises(LineupError):
+        engine.generate_batch("Quick", 1)
+    assert len(LineupEngine(ATTACKERS[:4], DEFENDERS, allow_insufficient=True).generate_batch("Quick", 1)) == 1
+
+
+def side_frequencies(lineups, part):
+    counts = Counter(op for lineup in lineups for side in ("attackers", "defenders") for op in lineup[part][side])
+    total = sum(counts.values())
+    return {op: count / total for op, count in counts.items()}
+
+
+# A pool smaller than the round count (repeats and borrowed backups), a pool with borrowed backups, a full one
+# and a weighted one.
+@pytest.mark.parametrize("enabled, weights", [(3, {}), (12, {}), (20, {}), (12, {"A0": 4.0, "D5": 0.25})])
+def test_sample_bulk_agrees_with_pick_side(enabled, weights):
+    np = pytest.importorskip("numpy")
+    disabled = ATTACKERS[enabled:] + DEFENDERS[enabled:]
+    engine = LineupEngine(ATTACKERS, DEFENDERS, disabled, allow_insufficient=True, seed=99)
+    engine.set_weights(weights)
+    n = 20_000
+    bulk = engine.sample_bulk("Ranked", n, seed=5)
+    from_bulk = [decode_bulk(bulk, i) for i in range(n)]
+    from_pick = [(rounds, backups) for _, rounds, backups in engine.generate_batch("Ranked", n)]
+    for lineups in (from_bulk, from_pick):
+        for rounds, backups in lineups[:500]:
+            for side in ("attackers", "defenders"):
+                assert not set(rounds[side] + backups[side]) & set(disabled)
+                assert len(rounds[side]) == len(backups[side]) == 9
+                if enabled >= 9: assert len(set(rounds[side])) == 9
+                if enabled >= 18: assert not set(rounds[side]) & set(backups[side])
+    for part in (0, 1):
+        bulk_freq, pick_freq = side_frequencies(from_bulk, part), side_frequencies(from_pick, part)
+        assert bulk_freq.keys() == pick_freq.keys()
+        assert max(abs(bulk_freq[op] - pick_freq[op]) for op in bulk_freq) < 0.01
+    distinct = lambda lineups: np.mean([len(set(rounds["attackers"])) for rounds, _ in lineups])
+    assert abs(distinct(from_bulk) - distinct(from_pick)) < 0.05
+
+
+def test_export_import_disabled_round_trip():
+    engine = make_engine()
+    exported = engine.export_disabled()
+    other = LineupEngine(ATTACKERS, DEFENDERS)
+    other.import_disabled(exported)
+    assert other.disabled_operators == engine.disabled_operators
+    with pytest.raises(LineupError):
+        LineupEngine(ATTACKERS[::-1], DEFENDERS).import_disabled(exported)
+
+
+def test_import_disabled_drops_bits_outside_the_roster():
+    engine = make_engine()
+    engine.import_disabled("f" * 30)
+    assert sorted(engine.disabled_operators) == sorted(ATTACKERS + DEFENDERS)
+    assert engine.enabled_count("attackers") == engine.enabled_count("defenders") == 0
+
+
+def test_seed_stream_jump_skips_seeds():
+    stream, reference = SeedStream(42), SeedStream(42)
+    seeds = [reference.next_seed() for _ in range(5)]
+    stream.jump(3)
+    assert stream.next_seed() == seeds[3]
+
+
+def test_seed_stream_split_is_stable_and_independent():
+    stream = SeedStream(42)
+    child = stream.split("server")
+    child_seeds = [child.next_seed() for _ in range(3)]
+    assert stream.counter == 0 # Splitting never advances the parent
+    parent_seeds = [stream.next_seed() for _ in range(3)]
+    other = stream.split("bot")
+    other_seeds = [other.next_seed() for _ in range(3)]
+    assert len(set(child_seeds + parent_seeds + other_seeds)) == 9
+    fresh_child = SeedStream(42).split("server")
+    assert [fresh_child.next_seed() for _ in range(3)] == child_seeds
+
+
+REPLAY_OPTIONS = {"plain": {}, "weights": {"weights": {"A0": 5.0, "A1": 0.2, "D2": 3.0}},
+                  "recency": {"policies": ("downweight", "exclude")}, "coverage": {"coverage": True}}
+
+
+def configured_engine(options):
+    engine = make_engine()
+    engine.set_weights(options.get("weights", {}))
+    engine.coverage_mode = options.get("coverage", False)
+    return engine
+
+
+def generate_with_records(engine, mode, batch_size):
+    """[(rounds, backups, record)] from one generate call, or from one generate_batch call if batch_size is set."""
+    if batch_size is None:
+        _, rounds, backups = engine.generate(mode)
+        return [(rounds, backups, engine.lineup_record(mode))]
+    return [(rounds, backups, record) for _, rounds, backups, record in engine.generate_batch(mode, batch_size, records=True)]
+
+
+@pytest.mark.parametrize("options", REPLAY_OPTIONS.values(), ids=REPLAY_OPTIONS.keys())
+@pytest.mark.parametrize("batch_size", [None, 4])
+@pytest.mark.parametrize("mode", ["Ranked", "Quick"])
+def test_replay_matches_generate(options, batch_size, mode):
+    engine = configured_engine(options)
+    policies = options.get("policies")
+    for step in range(30):
+        # Switching policy between lineups is what used to break replays of cached alias tables.
+        if policies: engine.recency_policy = policies[step % len(policies)]
+        lineups = generate_with_records(engine, mode, batch_size)
+        for rounds, backups, record in lineups:
+            assert replay_lineup(ATTACKERS, DEFENDERS, record) == (rounds, backups)
+        engine.remember(lineups[-1][0])
+
+
+def test_same_seed_gives_same_lineup():
+    assert make_engine().generate("Ranked", seed=7) == make_engine().generate("Ranked", seed=7)
+    assert make_engine().generate_batch("Quick", 5) == make_engine().generate_batch("Quick", 5)
+
+
+def test_replay_rejects_other_roster():
+    engine = make_engine()
+    engine.generate("Quick")
+    with pytest.raises(LineupError):
+        replay_lineup(ATTACKERS + ["A20"], DEFENDERS, engine.lineup_record("Quick"))
+
+
+def test_alias_table_draws_in_proportion_to_weights():
+    table, rng = AliasTable([4, 9, 11], [1.0, 2.0, 7.0]), random.Random(3)
+    counts = Counter(table.draw(rng) for _ in range(50_000))
+    for item, share in ((4, 0.1), (9, 0.2), (11, 0.7)):
+        assert abs(counts[item] / 50_000 - share) < 0.01
+    assert sorted(table.draw_distinct(rng, 3)) == [4, 9, 11]
+
+
+@pytest.mark.parametrize("batch", [False, True])
+def test_exclude_policy_skips_recent_operators(batch):
+    engine = make_engine()
+    engine.recency_policy = "exclude"
+    _, rounds, _ = engine.generate("Quick")
+    engine.remember(rounds)
+    recent = set(rounds["attackers"] + rounds["defenders"])
+    lineups = engine.generate_batch("Quick", 20) if batch else [engine.generate("Quick") for _ in range(20)]
+    for _, rounds, _ in lineups:
+        assert not recent & set(rounds["attackers"] + rounds["defenders"])
+
+
+@pytest.mark.parametrize("option", ["recency_policy", "coverage_mode"])
+def test_sample_bulk_refuses_recency_and_coverage(option):
+    pytest.importorskip("numpy")
+    engine = make_engine()
+    setattr(engine, option, "exclude" if option == "recency_policy" else True)
+    with pytest.raises(LineupError):
+        engine.sample_bulk("Quick", 10)
+
+
+@pytest.mark.parametrize("mode", ["Quick", "Ranked"])
+@pytest.mark.parametrize("batch", [False, True])
+def test_shuffle_bag_plays_everyone_before_repeats(mode, batch):
+    engine = make_engine()
+    engine.coverage_mode = True
+    played = Counter()
+    for _ in range(10):
+        lineups = engine.generate_batch(mode, 4) if batch else [engine.generate(mode)]
+        for _, rounds, _ in lineups:
+            for side in ("attackers", "defenders"):
+                assert len(set(rounds[side])) == len(rounds[side])
+                played.update(rounds[side])
+            for roster in (ATTACKERS, DEFENDERS):
+                counts = [played[op] for op in roster if op not in DISABLED]
+                assert max(counts) - min(counts) <= 1
+    assert not any(played[op] for op in DISABLED)
+
+
+@pytest.mark.parametrize("unique_per_player", [True, False])
+def test_squad_constraints(unique_per_player):
+    engine = make_engine()
+    player_disabled = [["A0", "D0"], ["A1"], [], ["D1", "D2"], ["A4"]]
+    for seed in range(20):
+        squad = engine.generate_squad(player_disabled, "Ranked", unique_per_player, seed=seed)
+        assert len(squad) == len(player_disabled)
+        for side in ("attackers", "defenders"):
+            for r in range(9):
+                picks = [lineup[side][r] for lineup in squad]
+                assert len(set(picks)) == len(picks)
+            for lineup, disabled in zip(squad, player_disabled):
+                assert not set(lineup[side]) & set(disabled + DISABLED)
+                if unique_per_player: assert len(set(lineup[side])) == 9
+
+
+def test_squad_rejects_bad_sizes_and_modes():
+    engine = make_engine()
+    with pytest.raises(LineupError):
+        engine.generate_squad([[]] * (SQUAD_SIZE + 1), "Quick")
+    with pytest.raises(LineupError):
+        engine.generate_squad([], "Quick")
+    with pytest.raises(LineupError, match="Unknown mode"):
+        engine.generate_squad([[]], "Rankd")
+
+
+def test_squad_search_limit_is_not_reported_as_impossible(monkeypatch):
+    engine = LineupEngine(ATTACKERS[:4], DEFENDERS)
+    with pytest.raises(LineupError, match="Cannot give"):
+        engine.generate_squad([[]] * 5, "Quick")
+    monkeypatch.setattr(lineup_engine, "SQUAD_SEARCH_LIMIT", 0)
+    with pytest.raises(LineupError, match="gave up"):
+        make_engine().generate_squad([[]] * 5, "Quick")
@@ -0,0 +1,28 @@
+import statistics
+import pytest
+
+np = pytest.importorskip("numpy")
+import lineup_stats
+
+
+# pool == round count (no-repeat draws) and small pools with borrowed backups used to skew z by construction.
+@pytest.mark.parametrize("mode, pool_size", [("Quick", 5), ("Ranked", 9), ("Quick", 3), ("Ranked", 12)])
+def test_uniform_sampler_gives_z_near_zero(mode, pool_size):
+    zs = {"main": [], "backup": []}
+    for seed in range(8):
+        stats = lineup_stats.simulate(mode, pool_size, 20_000, np.random.default_rng(seed))
+        for part in zs: zs[part].append(stats[part]["z"])
+    for part, values in zs.items():
+        assert all(abs(z) < 4 for z in values), (part, values)
+        assert abs(statistics.fmean(values)) < 1.2, (part, values)
+
+
+def test_reference_path_gives_z_near_zero():
+    stats = lineup_stats.reference_stats("Quick", 3, 20_000, seed=7)
+    assert abs(stats["main"]["z"]) < 4 and abs(stats["backup"]["z"]) < 4
+
+
+def test_skewed_counts_give_large_z():
+    counts = np.array([1200, 1000, 1000, 1000])
+    chi2, dof = lineup_stats.chi_square(counts)
+    assert dof == 3 and (chi2 - dof) / (2 * dof) ** 0.5 > 3
@@ -0,0 +1,55 @@
+# On-disk cache of resized operator icons, so warm starts load ready-to-display PNGs instead of resampling.
+# Entries are named after the operator, size, variant and a hash of the source icon's bytes, so an icon
+# replaced by the scraper gets a new key and its old thumbnails are removed when the new one is written.
+import hashlib
+import os
+from icon_atlas import render_icon
+
+HASH_SIZE = 16 # bytes of blake2b digest in each cache key
+
+
+def source_hash(image_path):
+    with open(image_path, 'rb') as f:
+        return hashlib.blake2b(f.read(), digest_size=HASH_SIZE).hexdigest()
+
+
+class ThumbnailCache:
+    """Maps (source icon, size, variant) to a cached PNG of the resized icon, rendering it on a miss."""
+    def __init__(self, cache_dir):
+        self.cache_dir = cache_dir
+        self.hits = 0
+        self.misses = 0
+
+    def thumbnail(self, image_path, size, greyscale=False):
+        """Returns the path of the cached thumbnail, or None if it could not be written.
+
+        Raises FileNotFoundError if the source icon does not exist.
+        """
+        stem = os.path.basename(image_path).rsplit('.', 1)[0]
+        prefix = f"{stem}.{size}.{'grey' if greyscale else 'color'}."
+        path = os.path.join(self.cache_dir, f"{prefix}{source_hash(image_path)}.png")
+        if os.path.exists(path):
+            self.hits += 1
+            return path
+        self.misses += 1
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            temp_path = path + '.tmp'
+            render_icon(image_path, (size, size), greyscale).save(temp_path, format='PNG')
+            os.replace(temp_path, path) # Never leave a half-written entry behind
+            self._remove_stale(prefix, path)
+        except OSError:
+            return None
+        return path
+
+    def _remove_stale(self, prefix, keep):
+        """Deletes thumbnails of the same icon, size and variant rendered from older source bytes."""
+        for entry in os.scandir(self.cache_dir):
+            if entry.name.startswith(prefix) and entry.path != keep:
+                try: os.remove(entry.path)
+                except OSError: pass
+
+    def clear(self):
+        if not os.path.isdir(self.cache_dir): return
+        for entry in os.scandir(self.cache_dir):
+            if entry.is_file(): os.remove(entry.path)